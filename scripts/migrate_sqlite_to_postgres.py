@@ -6,9 +6,10 @@ Migrates relational data from SQLite to PostgreSQL.
 Vector data must be re-imported after migration.
 """
 
-import sqlite3
 import argparse
+import sqlite3
 import sys
+import zlib
 from datetime import datetime
 
 try:
@@ -19,6 +20,18 @@ except ImportError:
     sys.exit(1)
 
 
+def _from_epoch_micros(value):
+    """Convert SQLite's integer epoch-microsecond timestamps to datetimes.
+
+    created_at on sessions/messages is stored as an integer in SQLite;
+    Postgres TIMESTAMP columns need the datetime back. Pre-migration rows
+    still stored as ISO strings pass through unchanged.
+    """
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value / 1_000_000)
+    return value
+
+
 def migrate(sqlite_path: str, postgres_url: str, dry_run: bool = False):
     print(f"{'[DRY RUN] ' if dry_run else ''}Migrating from SQLite to PostgreSQL...")
     print(f"  Source: {sqlite_path}")
@@ -54,7 +67,7 @@ def migrate(sqlite_path: str, postgres_url: str, dry_run: bool = False):
                 metadata = session["metadata"] if session["metadata"] else '{}'
                 cur.execute(
                     "INSERT INTO sessions (id, user_id, created_at, metadata) VALUES (%s, %s, %s, %s::jsonb) ON CONFLICT (id) DO NOTHING",
-                    (session["id"], session["user_id"], session["created_at"], metadata)
+                    (session["id"], session["user_id"], _from_epoch_micros(session["created_at"]), metadata)
                 )
                 session_count += 1
             print(f"  ✓ Migrated {session_count} sessions")
@@ -68,7 +81,7 @@ def migrate(sqlite_path: str, postgres_url: str, dry_run: bool = False):
                     """INSERT INTO messages (id, session_id, role, content, psych_update, created_at, semantic_processed_at)
                        VALUES (%s, %s, %s, %s, %s::jsonb, %s, %s) ON CONFLICT (id) DO NOTHING""",
                     (msg["id"], msg["session_id"], msg["role"], msg["content"],
-                     psych_update, msg["created_at"], msg["semantic_processed_at"])
+                     psych_update, _from_epoch_micros(msg["created_at"]), msg["semantic_processed_at"])
                 )
                 message_count += 1
             print(f"  ✓ Migrated {message_count} messages")
@@ -91,7 +104,7 @@ def migrate(sqlite_path: str, postgres_url: str, dry_run: bool = False):
                 sqlite_profiles = sqlite_conn.execute("SELECT * FROM profiles").fetchall()
                 profile_count = 0
                 for profile in sqlite_profiles:
-                    consensus_log = profile["consensus_log"] if profile.get("consensus_log") else None
+                    consensus_log = profile["consensus_log"] if profile["consensus_log"] else None
                     cur.execute(
                         """INSERT INTO profiles (id, user_id, version, content, consensus_log, created_at)
                            VALUES (%s, %s, %s, %s, %s::jsonb, %s) ON CONFLICT (id) DO NOTHING""",
@@ -107,9 +120,16 @@ def migrate(sqlite_path: str, postgres_url: str, dry_run: bool = False):
                 print("📦 Migrating condensed summaries...")
                 sqlite_summaries = sqlite_conn.execute("SELECT * FROM condensed_summaries").fetchall()
                 summary_count = 0
+                columns = {row[1] for row in sqlite_conn.execute("PRAGMA table_info(condensed_summaries)")}
                 for summary in sqlite_summaries:
-                    source_ids = summary["source_summary_ids"] if summary.get("source_summary_ids") else '[]'
-                    consensus = summary["consensus_log"] if summary.get("consensus_log") else None
+                    source_ids = summary["source_summary_ids"] if "source_summary_ids" in columns and summary["source_summary_ids"] else '[]'
+                    consensus = summary["consensus_log"] if "consensus_log" in columns and summary["consensus_log"] else None
+                    # Large summaries are stored deflate-compressed with an
+                    # empty content column; inline the text so the target
+                    # needs only the legacy columns.
+                    content = summary["content"]
+                    if "content_compressed" in columns and summary["content_compressed"]:
+                        content = zlib.decompress(summary["content_compressed"]).decode("utf-8")
                     cur.execute(
                         """INSERT INTO condensed_summaries
                            (id, user_id, level, content, period_start, period_end,
@@ -117,7 +137,7 @@ def migrate(sqlite_path: str, postgres_url: str, dry_run: bool = False):
                             consensus_log, created_at)
                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb, %s)
                            ON CONFLICT (id) DO NOTHING""",
-                        (summary["id"], summary["user_id"], summary["level"], summary["content"],
+                        (summary["id"], summary["user_id"], summary["level"], content,
                          summary["period_start"], summary["period_end"],
                          summary["source_message_count"], summary["source_word_count"],
                          source_ids, consensus, summary["created_at"])
@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class _CacheEntry:
+    embedding: np.ndarray
+    prefix_hash: str
+    answer: str
+    stored_at: float
+
+
+class SemanticResponseCache:
+    """Bounded LRU cache of chat answers keyed on query embedding.
+
+    A lookup matches when the query embedding is within `similarity_threshold`
+    cosine similarity of a stored entry AND the conversation prefix hash
+    matches, so a near-duplicate question in the same conversational context
+    can skip the LLM call entirely. Embeddings are kept in a single float32
+    matrix so lookup is one matrix-vector product.
+    """
+
+    def __init__(self, maxsize: int = 2048, similarity_threshold: float = 0.92, ttl_seconds: int = 7 * 86400):
+        self.maxsize = maxsize
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._next_key = 0
+        self._matrix: np.ndarray | None = None
+        self._matrix_keys: list[int] = []
+
+    def _normalize(self, embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        return vector
+
+    def _rebuild_matrix(self) -> None:
+        if self._entries:
+            self._matrix = np.stack([entry.embedding for entry in self._entries.values()])
+            self._matrix_keys = list(self._entries.keys())
+        else:
+            self._matrix = None
+            self._matrix_keys = []
+
+    def lookup(self, embedding: np.ndarray, prefix_hash: str) -> str | None:
+        if self._matrix is None:
+            return None
+
+        query = self._normalize(embedding)
+        similarities = self._matrix @ query
+        best_idx = int(np.argmax(similarities))
+        if similarities[best_idx] < self.similarity_threshold:
+            return None
+
+        key = self._matrix_keys[best_idx]
+        entry = self._entries[key]
+        if entry.prefix_hash != prefix_hash:
+            return None
+        if time.time() - entry.stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self._rebuild_matrix()
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.answer
+
+    def store(self, embedding: np.ndarray, prefix_hash: str, answer: str) -> None:
+        if len(self._entries) >= self.maxsize:
+            self._entries.popitem(last=False)
+
+        key = self._next_key
+        self._next_key += 1
+        self._entries[key] = _CacheEntry(
+            embedding=self._normalize(embedding),
+            prefix_hash=prefix_hash,
+            answer=answer,
+            stored_at=time.time(),
+        )
+        self._rebuild_matrix()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._rebuild_matrix()
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Any
 
 import anthropic
+import orjson
 import yaml
 from openai import OpenAI
 
@@ -326,7 +327,6 @@ Respond with JSON:
 
         log_data = {"log_id": log_id, "timestamp": timestamp.isoformat(), **result.to_dict()}
 
-        with open(log_file, "w") as f:
-            json.dump(log_data, f, indent=2)
+        log_file.write_bytes(orjson.dumps(log_data, option=orjson.OPT_INDENT_2))
 
         return log_file
@@ -1,5 +1,6 @@
 import json
 import logging
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
@@ -20,6 +21,11 @@ class EmperorBrain:
         self.prompts = self._load_prompts()
         self.model = self.config["models"]["main"]
         self._system_prompt = self.prompts.get("marcus_aurelius_system", "")
+        # The persona/safety rules are static across turns, so they form a
+        # cacheable system prefix; only the profile/narrative tail changes.
+        prefix_template, marker, dynamic = self._system_prompt.partition("## About This Person")
+        self._system_prefix = prefix_template.format()
+        self._system_dynamic = marker + dynamic
 
     def _load_prompts(self) -> dict[str, str]:
         prompts_path = Path("config/prompts.yaml")
@@ -28,12 +34,12 @@ class EmperorBrain:
                 return yaml.safe_load(f)
         return {}
 
-    def respond(
+    def _build_context_prompt(
         self,
         user_message: str,
         conversation_history: list[Message] | None = None,
         retrieved_context: dict[str, Any] | None = None,
-    ) -> EmperorResponse:
+    ) -> tuple[str, str]:
         prompt_parts = []
 
         profile_text = "No profile yet - this is a new user."
@@ -72,10 +78,20 @@ class EmperorBrain:
                 prompt_parts.append(f"{role}: {msg.content}")
 
         prompt_parts.append(f"\n## Current Message\nUser: {user_message}")
-        prompt_parts.append("\nRespond with the JSON object as specified.")
 
-        full_prompt = "\n".join(prompt_parts)
-        system_prompt = self._system_prompt.format(profile=profile_text, narrative=narrative_text)
+        system_suffix = self._system_dynamic.format(profile=profile_text, narrative=narrative_text)
+        return "\n".join(prompt_parts), system_suffix
+
+    def respond(
+        self,
+        user_message: str,
+        conversation_history: list[Message] | None = None,
+        retrieved_context: dict[str, Any] | None = None,
+    ) -> EmperorResponse:
+        context_prompt, system_suffix = self._build_context_prompt(
+            user_message, conversation_history, retrieved_context
+        )
+        full_prompt = context_prompt + "\n\nRespond with the JSON object as specified."
 
         max_attempts = 2
         last_error = None
@@ -84,7 +100,8 @@ class EmperorBrain:
             try:
                 response_text = self.llm.generate(
                     prompt=full_prompt,
-                    system_prompt=system_prompt,
+                    system_prompt=self._system_prefix,
+                    system_suffix=system_suffix,
                     model=self.model,
                     temperature=0.7 + (attempt * 0.1),
                     max_tokens=2000,
@@ -110,6 +127,33 @@ class EmperorBrain:
             psych_update=self._empty_psych_update(["response_generation_failed"]),
         )
 
+    def respond_stream(
+        self,
+        user_message: str,
+        conversation_history: list[Message] | None = None,
+        retrieved_context: dict[str, Any] | None = None,
+    ) -> Iterator[str]:
+        """Yield the reply incrementally as plain prose chunks.
+
+        The streaming path trades the JSON envelope (and with it the psych
+        update) for first-token latency: chunks are forwarded as the model
+        produces them, and the caller persists the assembled text when the
+        stream ends.
+        """
+        context_prompt, system_suffix = self._build_context_prompt(
+            user_message, conversation_history, retrieved_context
+        )
+        full_prompt = context_prompt + "\n\nRespond as Marcus Aurelius in plain prose, without any JSON wrapper."
+
+        yield from self.llm.generate_stream(
+            prompt=full_prompt,
+            system_prompt=self._system_prefix,
+            system_suffix=system_suffix,
+            model=self.model,
+            temperature=0.7,
+            max_tokens=2000,
+        )
+
     def _strip_markdown_fences(self, text: str) -> str:
         text = text.strip()
         if text.startswith("```"):
@@ -1,4 +1,5 @@
 import os
+import zlib
 from contextlib import contextmanager
 from datetime import datetime
 from typing import Any
@@ -10,17 +11,56 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
+    bindparam,
     create_engine,
     desc,
+    event,
     func,
     select,
+    update,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+from sqlalchemy.types import TypeDecorator
 
 from src.models.schemas import CondensedSummary, Message, PsychUpdate, SemanticInsight, Session, User
 
+# Summaries shorter than this compress poorly enough that the deflate
+# header overhead is not worth paying; store them as plain text.
+_SUMMARY_COMPRESS_MIN_CHARS = 512
+
+
+class EpochMicros(TypeDecorator):
+    """Store datetimes as integer epoch microseconds on SQLite.
+
+    SQLite keeps DateTime columns as ISO strings, which costs a string
+    parse per row on every read; integers skip the parse, take less
+    space, and compare faster in ORDER BY. Microseconds (not millis)
+    preserve the full resolution of datetime.now(). PostgreSQL already
+    stores TIMESTAMP natively — and deployed databases hold such
+    columns — so there the type stays a plain DateTime passthrough.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(Integer())
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != "sqlite":
+            return value
+        return int(value.timestamp() * 1_000_000)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name != "sqlite":
+            return value
+        return datetime.fromtimestamp(value / 1_000_000)
+
 
 class Base(DeclarativeBase):
     pass
@@ -39,10 +79,11 @@ class SessionModel(Base):
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(EpochMicros, default=datetime.now)
     metadata_: Mapped[dict | None] = mapped_column("metadata", JSON, default=dict)
+    message_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
-    __table_args__ = (Index("idx_sessions_user", "user_id"),)
+    __table_args__ = (Index("idx_sessions_user_created", "user_id", "created_at"),)
 
 
 class MessageModel(Base):
@@ -53,11 +94,11 @@ class MessageModel(Base):
     role: Mapped[str] = mapped_column(String)
     content: Mapped[str] = mapped_column(Text)
     psych_update: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(EpochMicros, default=datetime.now)
     semantic_processed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     __table_args__ = (
-        Index("idx_messages_session", "session_id"),
+        Index("idx_messages_session_created", "session_id", "created_at"),
         Index("idx_messages_semantic", "semantic_processed_at"),
     )
 
@@ -93,6 +134,11 @@ class CondensedSummaryModel(Base):
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"))
     level: Mapped[int] = mapped_column(Integer)
     content: Mapped[str] = mapped_column(Text)
+    # Large summaries are stored deflate-compressed; content then holds ""
+    # and content_length keeps the original character count for budget math.
+    content_compressed: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    content_length: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    token_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
     period_start: Mapped[datetime] = mapped_column(DateTime)
     period_end: Mapped[datetime] = mapped_column(DateTime)
     source_message_count: Mapped[int] = mapped_column(Integer)
@@ -114,6 +160,20 @@ class SchemaVersionModel(Base):
     applied_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
 
+# Hot-path statements built once at import. SQLAlchemy caches the compiled
+# SQL either way, but constructing the select() object per call still costs
+# Python time on every request; these are reused with bound parameters.
+_LIST_SESSIONS_STMT = (
+    select(SessionModel.id, SessionModel.created_at, SessionModel.message_count)
+    .where(SessionModel.user_id == bindparam("user_id"))
+    .order_by(desc(SessionModel.created_at))
+)
+
+_SESSION_MESSAGES_STMT = (
+    select(MessageModel).where(MessageModel.session_id == bindparam("session_id")).order_by(MessageModel.created_at)
+)
+
+
 class Database:
     def __init__(self, database_url: str | None = None):
         self.database_url = database_url or os.getenv("DATABASE_URL", "sqlite:///./data/stoic_emperor.db")
@@ -128,17 +188,41 @@ class Database:
             Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
         is_sqlite = self.database_url.startswith("sqlite")
+        is_memory = ":memory:" in self.database_url or "mode=memory" in self.database_url
+        # Pool connections for SQLite too: handlers run across worker
+        # threads, so check_same_thread must be off, and reusing pooled
+        # connections avoids a sqlite3.connect() per call. In-memory
+        # databases get SQLAlchemy's own pooling, which rejects queue-pool
+        # sizing arguments.
+        pool_kwargs: dict[str, Any] = (
+            {} if is_memory else {"pool_pre_ping": True, "pool_size": 20, "max_overflow": 10, "pool_recycle": 3600}
+        )
         self.engine = create_engine(
             self.database_url,
-            pool_pre_ping=True,
-            **({"pool_size": 5, "max_overflow": 10} if not is_sqlite else {}),
+            **pool_kwargs,
+            **({"connect_args": {"check_same_thread": False}} if is_sqlite else {}),
         )
+        if is_sqlite:
+            event.listen(self.engine, "connect", self._set_sqlite_pragmas)
         self._session_factory = sessionmaker(bind=self.engine)
 
         Base.metadata.create_all(self.engine)
         self._run_column_migrations()
+        self._ensure_indexes()
         self._ensure_schema_version()
 
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        # WAL lets readers proceed while a writer commits, and NORMAL
+        # synchronous skips the per-commit fsync that dominates write
+        # latency under concurrent request handlers. journal_mode persists
+        # in the database file; the others are per-connection.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+
     def _run_column_migrations(self) -> None:
         from sqlalchemy import inspect as sa_inspect
         from sqlalchemy import text
@@ -150,6 +234,67 @@ class Database:
                 conn.execute(text("ALTER TABLE users ADD COLUMN name TEXT"))
                 conn.commit()
 
+        # created_at on sessions/messages moved from ISO strings to epoch
+        # microseconds; convert any rows still stored as text. SQLite's
+        # flexible typing lets the values change in place. Postgres keeps
+        # native TIMESTAMP columns (EpochMicros passes through there), so
+        # this backfill is SQLite-only. The legacy strings were written
+        # with local-time datetime.now(), so the 'utc' modifier converts
+        # them to UTC before the epoch arithmetic; without it every
+        # migrated row would shift by the host's UTC offset.
+        if self.engine.dialect.name == "sqlite":
+            with self.engine.connect() as conn:
+                for table in ("sessions", "messages"):
+                    conn.execute(
+                        text(
+                            f"UPDATE {table} SET created_at = "
+                            "CAST((julianday(created_at, 'utc') - 2440587.5) * 86400000000 AS INTEGER) "
+                            "WHERE typeof(created_at) = 'text'"
+                        )
+                    )
+                conn.commit()
+
+        summary_columns = {col["name"] for col in inspector.get_columns("condensed_summaries")}
+        if "content_compressed" not in summary_columns:
+            with self.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE condensed_summaries ADD COLUMN content_compressed BLOB"))
+                conn.execute(text("ALTER TABLE condensed_summaries ADD COLUMN content_length INTEGER"))
+                conn.execute(text("UPDATE condensed_summaries SET content_length = LENGTH(content)"))
+                conn.commit()
+
+        if "token_count" not in summary_columns:
+            with self.engine.connect() as conn:
+                # Left NULL for existing rows; readers fall back to
+                # estimating and new writes fill it in.
+                conn.execute(text("ALTER TABLE condensed_summaries ADD COLUMN token_count INTEGER"))
+                conn.commit()
+
+        session_columns = {col["name"] for col in inspector.get_columns("sessions")}
+        if "message_count" not in session_columns:
+            with self.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0"))
+                conn.execute(
+                    text(
+                        "UPDATE sessions SET message_count = "
+                        "(SELECT COUNT(*) FROM messages WHERE messages.session_id = sessions.id)"
+                    )
+                )
+                conn.commit()
+
+    def _ensure_indexes(self) -> None:
+        # create_all only builds indexes for tables it creates, so databases
+        # that predate the composite indexes pick them up here. They cover
+        # the filter+order pattern of get_session_messages and
+        # get_latest_session, turning full scans into index seeks.
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            conn.execute(
+                text("CREATE INDEX IF NOT EXISTS idx_messages_session_created ON messages (session_id, created_at)")
+            )
+            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_sessions_user_created ON sessions (user_id, created_at)"))
+            conn.commit()
+
     def _ensure_schema_version(self) -> None:
         with self._session() as session:
             existing = session.get(SchemaVersionModel, 4)
@@ -238,40 +383,94 @@ class Database:
         return None
 
     def get_user_sessions_with_counts(self, user_id: str) -> list[dict[str, Any]]:
+        # Reads the denormalized counter maintained by save_message, so this
+        # stays O(sessions) instead of joining the whole messages table.
+        with self._session() as session:
+            rows = session.execute(_LIST_SESSIONS_STMT, {"user_id": user_id}).all()
+            return [{"id": row.id, "created_at": row.created_at, "message_count": row.message_count} for row in rows]
+
+    def save_message(self, message: Message) -> Message:
+        self.save_messages([message])
+        return message
+
+    def save_messages(self, messages: list[Message]) -> list[Message]:
+        """Persist several messages in one transaction.
+
+        A chat turn writes both the user and emperor messages; committing
+        them together costs one fsync instead of one per message.
+        """
+        with self._session() as session:
+            counts_per_session: dict[str, int] = {}
+            for message in messages:
+                psych_dict = message.psych_update.model_dump() if message.psych_update else None
+                model = MessageModel(
+                    id=message.id,
+                    session_id=message.session_id,
+                    role=message.role,
+                    content=message.content,
+                    psych_update=psych_dict,
+                    created_at=message.created_at,
+                    semantic_processed_at=message.semantic_processed_at,
+                )
+                session.add(model)
+                counts_per_session[message.session_id] = counts_per_session.get(message.session_id, 0) + 1
+            for session_id, count in counts_per_session.items():
+                session.execute(
+                    update(SessionModel)
+                    .where(SessionModel.id == session_id)
+                    .values(message_count=SessionModel.message_count + count)
+                )
+        return messages
+
+    def get_session_with_messages(self, session_id: str) -> tuple[Session | None, list[Message]]:
+        """Fetch a session and its message history in one round trip.
+
+        Projects only the columns the history endpoint renders, leaving the
+        psych_update blobs out of the transfer.
+        """
         with self._session() as session:
             stmt = (
                 select(
                     SessionModel.id,
+                    SessionModel.user_id,
                     SessionModel.created_at,
-                    func.count(MessageModel.id).label("message_count"),
+                    SessionModel.metadata_,
+                    MessageModel.id.label("message_id"),
+                    MessageModel.role,
+                    MessageModel.content,
+                    MessageModel.created_at.label("message_created_at"),
                 )
-                .outerjoin(MessageModel, SessionModel.id == MessageModel.session_id)
-                .where(SessionModel.user_id == user_id)
-                .group_by(SessionModel.id, SessionModel.created_at)
-                .order_by(desc(SessionModel.created_at))
+                .outerjoin(MessageModel, MessageModel.session_id == SessionModel.id)
+                .where(SessionModel.id == session_id)
+                .order_by(MessageModel.created_at)
             )
             rows = session.execute(stmt).all()
-            return [{"id": row.id, "created_at": row.created_at, "message_count": row.message_count} for row in rows]
-
-    def save_message(self, message: Message) -> Message:
-        with self._session() as session:
-            psych_dict = message.psych_update.model_dump() if message.psych_update else None
-            model = MessageModel(
-                id=message.id,
-                session_id=message.session_id,
-                role=message.role,
-                content=message.content,
-                psych_update=psych_dict,
-                created_at=message.created_at,
-                semantic_processed_at=message.semantic_processed_at,
+            if not rows:
+                return None, []
+
+            first = rows[0]
+            session_obj = Session(
+                id=first.id,
+                user_id=first.user_id,
+                created_at=first.created_at,
+                metadata=first.metadata_ or {},
             )
-            session.add(model)
-        return message
+            messages = [
+                Message(
+                    id=row.message_id,
+                    session_id=first.id,
+                    role=row.role,
+                    content=row.content,
+                    created_at=row.message_created_at,
+                )
+                for row in rows
+                if row.message_id is not None
+            ]
+            return session_obj, messages
 
     def get_session_messages(self, session_id: str) -> list[Message]:
         with self._session() as session:
-            stmt = select(MessageModel).where(MessageModel.session_id == session_id).order_by(MessageModel.created_at)
-            models = session.scalars(stmt).all()
+            models = session.scalars(_SESSION_MESSAGES_STMT, {"session_id": session_id}).all()
             return [self._model_to_message(m) for m in models]
 
     def get_unprocessed_messages(self, user_id: str) -> list[Message]:
@@ -294,18 +493,24 @@ class Database:
                 model.semantic_processed_at = datetime.now()
 
     def save_semantic_insight(self, insight: SemanticInsight) -> SemanticInsight:
-        with self._session() as session:
-            model = SemanticInsightModel(
-                id=insight.id,
-                user_id=insight.user_id,
-                source_message_id=insight.source_message_id,
-                assertion=insight.assertion,
-                confidence=insight.confidence,
-                created_at=insight.created_at,
-            )
-            session.add(model)
+        self.save_semantic_insights([insight])
         return insight
 
+    def save_semantic_insights(self, insights: list[SemanticInsight]) -> list[SemanticInsight]:
+        """Persist a batch of insights in one transaction."""
+        with self._session() as session:
+            for insight in insights:
+                model = SemanticInsightModel(
+                    id=insight.id,
+                    user_id=insight.user_id,
+                    source_message_id=insight.source_message_id,
+                    assertion=insight.assertion,
+                    confidence=insight.confidence,
+                    created_at=insight.created_at,
+                )
+                session.add(model)
+        return insights
+
     def get_user_insights(self, user_id: str) -> list[SemanticInsight]:
         with self._session() as session:
             stmt = (
@@ -378,23 +583,37 @@ class Database:
         return version
 
     def save_condensed_summary(self, summary: CondensedSummary) -> CondensedSummary:
-        with self._session() as session:
-            model = CondensedSummaryModel(
-                id=summary.id,
-                user_id=summary.user_id,
-                level=summary.level,
-                content=summary.content,
-                period_start=summary.period_start,
-                period_end=summary.period_end,
-                source_message_count=summary.source_message_count,
-                source_word_count=summary.source_word_count,
-                source_summary_ids=summary.source_summary_ids,
-                consensus_log=summary.consensus_log,
-                created_at=summary.created_at,
-            )
-            session.add(model)
+        self.save_condensed_summaries([summary])
         return summary
 
+    def save_condensed_summaries(self, summaries: list[CondensedSummary]) -> list[CondensedSummary]:
+        """Persist a batch of summaries in one transaction."""
+        with self._session() as session:
+            for summary in summaries:
+                content = summary.content
+                content_compressed = None
+                if len(content) >= _SUMMARY_COMPRESS_MIN_CHARS:
+                    content_compressed = zlib.compress(content.encode(), 6)
+                    content = ""
+                model = CondensedSummaryModel(
+                    id=summary.id,
+                    user_id=summary.user_id,
+                    level=summary.level,
+                    content=content,
+                    content_compressed=content_compressed,
+                    content_length=len(summary.content),
+                    period_start=summary.period_start,
+                    period_end=summary.period_end,
+                    source_message_count=summary.source_message_count,
+                    source_word_count=summary.source_word_count,
+                    source_summary_ids=summary.source_summary_ids,
+                    consensus_log=summary.consensus_log,
+                    token_count=summary.token_count,
+                    created_at=summary.created_at,
+                )
+                session.add(model)
+        return summaries
+
     def get_condensed_summaries(self, user_id: str, level: int | None = None) -> list[CondensedSummary]:
         with self._session() as session:
             stmt = select(CondensedSummaryModel).where(CondensedSummaryModel.user_id == user_id)
@@ -405,6 +624,63 @@ class Database:
             models = session.scalars(stmt).all()
             return [self._model_to_condensed_summary(m) for m in models]
 
+    def get_summary_statistics(self, user_id: str) -> list[dict[str, Any]]:
+        """Per-level aggregates over condensed summaries, computed in SQL.
+
+        Returns one row per level with counts, message/word totals and the
+        period bounds, so callers never hydrate summary rows just to
+        count them.
+        """
+        with self._session() as session:
+            stmt = (
+                select(
+                    CondensedSummaryModel.level,
+                    func.count().label("count"),
+                    func.sum(CondensedSummaryModel.source_message_count).label("messages"),
+                    func.sum(CondensedSummaryModel.source_word_count).label("words"),
+                    func.min(CondensedSummaryModel.period_start).label("earliest"),
+                    func.max(CondensedSummaryModel.period_end).label("latest"),
+                )
+                .where(CondensedSummaryModel.user_id == user_id)
+                .group_by(CondensedSummaryModel.level)
+            )
+            return [row._asdict() for row in session.execute(stmt)]
+
+    def get_summaries_for_budget(self, user_id: str, byte_budget: int) -> list[CondensedSummary]:
+        """Budget-scan candidates, pruned in SQL before hydration.
+
+        Walks summaries in the same preference order the context budget
+        scan uses (level descending, oldest first within a level) and
+        keeps only rows whose running content length starts inside the
+        byte budget, so rows far past the budget are not loaded into
+        Python at all. The scan can skip an oversized or already-covered
+        row and still take later ones, so callers must pass a budget
+        comfortably above what they intend to select; the cutoff here is
+        a coarse prune, not the selection itself.
+        """
+        with self._session() as session:
+            content_chars = func.coalesce(
+                CondensedSummaryModel.content_length, func.length(CondensedSummaryModel.content)
+            )
+            running = (
+                func.sum(content_chars)
+                .over(order_by=[desc(CondensedSummaryModel.level), CondensedSummaryModel.period_start])
+                .label("running_bytes")
+            )
+            candidates = (
+                select(CondensedSummaryModel.id.label("summary_id"), running)
+                .where(CondensedSummaryModel.user_id == user_id)
+                .subquery()
+            )
+            stmt = (
+                select(CondensedSummaryModel)
+                .join(candidates, CondensedSummaryModel.id == candidates.c.summary_id)
+                .where(candidates.c.running_bytes - content_chars < byte_budget)
+                .order_by(CondensedSummaryModel.level, CondensedSummaryModel.period_start)
+            )
+            models = session.scalars(stmt).all()
+            return [self._model_to_condensed_summary(m) for m in models]
+
     def get_messages_in_range(
         self,
         user_id: str,
@@ -425,6 +701,23 @@ class Database:
             models = session.scalars(stmt).all()
             return [self._model_to_message(m) for m in models]
 
+    def sum_message_content_length(self, user_id: str, start_date: datetime | None = None) -> int:
+        """Total characters of a user's message content, summed in SQL.
+
+        Lets callers estimate token volume without pulling every row into
+        Python just to measure it.
+        """
+        with self._session() as session:
+            stmt = (
+                select(func.coalesce(func.sum(func.length(MessageModel.content)), 0))
+                .select_from(MessageModel)
+                .join(SessionModel, MessageModel.session_id == SessionModel.id)
+                .where(SessionModel.user_id == user_id)
+            )
+            if start_date:
+                stmt = stmt.where(MessageModel.created_at > start_date)
+            return session.scalar(stmt) or 0
+
     def get_recent_messages(self, user_id: str, limit: int = 20) -> list[Message]:
         with self._session() as session:
             stmt = (
@@ -452,16 +745,20 @@ class Database:
         )
 
     def _model_to_condensed_summary(self, model: CondensedSummaryModel) -> CondensedSummary:
+        content = model.content
+        if model.content_compressed:
+            content = zlib.decompress(model.content_compressed).decode()
         return CondensedSummary(
             id=model.id,
             user_id=model.user_id,
             level=model.level,
-            content=model.content,
+            content=content,
             period_start=model.period_start,
             period_end=model.period_end,
             source_message_count=model.source_message_count,
             source_word_count=model.source_word_count,
             source_summary_ids=model.source_summary_ids or [],
             consensus_log=model.consensus_log,
+            token_count=model.token_count,
             created_at=model.created_at,
         )
@@ -217,75 +217,114 @@ class VectorStore:
         if not query_embeddings:
             raise ValueError("Either query_texts or query_embeddings must be provided")
 
-        results = {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
-
         with self._connection() as conn:
-            if self.is_postgres:  # pragma: no cover
-                from psycopg2.extras import RealDictCursor
+            return self._query_on_connection(conn, collection, query_embeddings, n_results, where)
 
-                cursor = conn.cursor(cursor_factory=RealDictCursor)  # type: ignore[call-overload]
-                for query_embedding in query_embeddings:
-                    where_clause = ""
-                    params: list[Any] = [query_embedding, n_results]
+    def query_batch(
+        self,
+        collections: list[str],
+        query_texts: list[str] | None = None,
+        query_embeddings: list[list[float]] | None = None,
+        n_results: int | list[int] = 5,
+        wheres: list[dict[str, Any] | None] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Query several collections with one shared embedding and connection.
+
+        Encodes the query once and reuses a single connection for all
+        lookups, avoiding per-collection encode and connection overhead.
+        Returns a mapping of collection name to the usual query result.
+        """
+        if query_embeddings is None and query_texts:
+            query_embeddings = self.embedding_model.encode(query_texts).tolist()
 
-                    if where:
-                        conditions = []
-                        for key, value in where.items():
-                            conditions.append(f"metadata->>'{key}' = %s")
-                            params.insert(-1, str(value))
-                        where_clause = "WHERE " + " AND ".join(conditions)
+        if not query_embeddings:
+            raise ValueError("Either query_texts or query_embeddings must be provided")
 
-                    cursor.execute(
-                        f"""SELECT id, document, metadata,
-                               1 - (embedding <=> %s::vector) as similarity
-                           FROM vector_{collection}
-                           {where_clause}
-                           ORDER BY embedding <=> %s::vector
-                           LIMIT %s""",
-                        params,
-                    )
+        if isinstance(n_results, int):
+            n_results = [n_results] * len(collections)
+        if wheres is None:
+            wheres = [None] * len(collections)
 
-                    rows = cursor.fetchall()
-                    results["ids"][0].extend([row["id"] for row in rows])
-                    results["documents"][0].extend([row["document"] for row in rows])
-                    results["metadatas"][0].extend([row["metadata"] if row["metadata"] else {} for row in rows])
-                    results["distances"][0].extend([1 - row["similarity"] for row in rows])
-            else:
-                cursor = conn.cursor()
+        results: dict[str, dict[str, Any]] = {}
+        with self._connection() as conn:
+            for collection, n, where in zip(collections, n_results, wheres, strict=True):
+                results[collection] = self._query_on_connection(conn, collection, query_embeddings, n, where)
+        return results
+
+    def _query_on_connection(
+        self,
+        conn: Any,
+        collection: str,
+        query_embeddings: list[list[float]],
+        n_results: int,
+        where: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        results: dict[str, Any] = {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+        if self.is_postgres:  # pragma: no cover
+            from psycopg2.extras import RealDictCursor
+
+            cursor = conn.cursor(cursor_factory=RealDictCursor)  # type: ignore[call-overload]
+            for query_embedding in query_embeddings:
                 where_clause = ""
-                params: list[Any] = []
+                params: list[Any] = [query_embedding, n_results]
 
                 if where:
                     conditions = []
                     for key, value in where.items():
-                        conditions.append(f"json_extract(metadata, '$.{key}') = ?")
-                        params.append(str(value))
+                        conditions.append(f"metadata->>'{key}' = %s")
+                        params.insert(-1, str(value))
                     where_clause = "WHERE " + " AND ".join(conditions)
 
                 cursor.execute(
-                    f"SELECT id, document, embedding, metadata FROM vector_{collection} {where_clause}", params
+                    f"""SELECT id, document, metadata,
+                           1 - (embedding <=> %s::vector) as similarity
+                       FROM vector_{collection}
+                       {where_clause}
+                       ORDER BY embedding <=> %s::vector
+                       LIMIT %s""",
+                    params,
                 )
-                rows = cursor.fetchall()
-
-                scored_rows = []
-                for row in rows:
-                    embedding = json.loads(row["embedding"]) if row["embedding"] else None
-                    if embedding:
-                        for query_embedding in query_embeddings:
-                            similarity = self._cosine_similarity(query_embedding, embedding)
-                            scored_rows.append((row, similarity))
-
-                scored_rows.sort(key=lambda x: x[1], reverse=True)
-                scored_rows = scored_rows[:n_results]
 
-                for row, similarity in scored_rows:
-                    results["ids"][0].append(row["id"])
-                    results["documents"][0].append(row["document"])
-                    metadata = json.loads(row["metadata"]) if row["metadata"] else {}
-                    results["metadatas"][0].append(metadata)
-                    results["distances"][0].append(1 - similarity)
+                rows = cursor.fetchall()
+                results["ids"][0].extend([row["id"] for row in rows])
+                results["documents"][0].extend([row["document"] for row in rows])
+                results["metadatas"][0].extend([row["metadata"] if row["metadata"] else {} for row in rows])
+                results["distances"][0].extend([1 - row["similarity"] for row in rows])
+        else:
+            cursor = conn.cursor()
+            where_clause = ""
+            params: list[Any] = []
 
-            cursor.close()
+            if where:
+                conditions = []
+                for key, value in where.items():
+                    conditions.append(f"json_extract(metadata, '$.{key}') = ?")
+                    params.append(str(value))
+                where_clause = "WHERE " + " AND ".join(conditions)
+
+            cursor.execute(f"SELECT id, document, embedding, metadata FROM vector_{collection} {where_clause}", params)
+            rows = cursor.fetchall()
+
+            scored_rows = []
+            for row in rows:
+                embedding = json.loads(row["embedding"]) if row["embedding"] else None
+                if embedding:
+                    for query_embedding in query_embeddings:
+                        similarity = self._cosine_similarity(query_embedding, embedding)
+                        scored_rows.append((row, similarity))
+
+            scored_rows.sort(key=lambda x: x[1], reverse=True)
+            scored_rows = scored_rows[:n_results]
+
+            for row, similarity in scored_rows:
+                results["ids"][0].append(row["id"])
+                results["documents"][0].append(row["document"])
+                metadata = json.loads(row["metadata"]) if row["metadata"] else {}
+                results["metadatas"][0].append(metadata)
+                results["distances"][0].append(1 - similarity)
+
+        cursor.close()
 
         return results
 
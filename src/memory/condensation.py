@@ -1,4 +1,8 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
 import tiktoken
@@ -8,6 +12,27 @@ from src.infrastructure.database import Database
 from src.models.schemas import CondensedSummary, Message
 from src.utils.llm_client import LLMClient
 
+# Without a cache dir tiktoken fetches its BPE ranks over the network on
+# every cold process; point it at a persistent location before first use.
+_TIKTOKEN_CACHE_DIR = os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.expanduser("~/.cache/stoic-emperor/tiktoken"))
+Path(_TIKTOKEN_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+
+
+@lru_cache(maxsize=8)
+def _get_encoder(model: str) -> tiktoken.Encoding:
+    # encoding_for_model loads BPE ranks from disk (or the network on a
+    # cold cache); share one encoder per model across manager instances.
+    return tiktoken.encoding_for_model(model)
+
+
+@lru_cache(maxsize=4096)
+def _token_count(text: str) -> int:
+    # Budget scans and hot-buffer walks re-count the same summary and
+    # message strings several times per request; memoize by content.
+    # encode_ordinary skips special-token scanning, which estimation
+    # never needs.
+    return len(_get_encoder("gpt-4").encode_ordinary(text))
+
 
 class CondensationManager:
     def __init__(self, db: Database, config: dict[str, Any]):
@@ -18,11 +43,19 @@ class CondensationManager:
         self.chunk_threshold_tokens = self.condensation_config.get("chunk_threshold_tokens", 8000)
         self.summary_budget_tokens = self.condensation_config.get("summary_budget_tokens", 12000)
         self.use_consensus = self.condensation_config.get("use_consensus", True)
+        # Upper bound on concurrent condensations; keeps batch runs from
+        # piling writes onto SQLite.
+        self.max_prefetch_slots = self.condensation_config.get("max_prefetch_slots", 4)
 
-        self.tokenizer = tiktoken.encoding_for_model("gpt-4")
+        self.tokenizer = _get_encoder("gpt-4")
 
     def estimate_tokens(self, text: str) -> int:
-        return len(self.tokenizer.encode(text))
+        return _token_count(text)
+
+    def estimate_tokens_batch(self, texts: list[str]) -> list[int]:
+        # One FFI call into tiktoken's Rust core, which releases the GIL
+        # and tokenizes the batch across threads.
+        return [len(tokens) for tokens in self.tokenizer.encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)]
 
     def get_uncondensed_messages(self, user_id: str) -> list[Message]:
         recent = self.db.get_recent_messages(user_id, limit=100)
@@ -30,10 +63,10 @@ class CondensationManager:
         if len(recent) <= 1:
             return []
 
+        counts = self.estimate_tokens_batch([msg.content for msg in recent])
         hot_buffer_count = 0
         hot_buffer_tokens = 0
-        for msg in reversed(recent):
-            tokens = self.estimate_tokens(msg.content)
+        for tokens in reversed(counts):
             if hot_buffer_tokens + tokens <= self.hot_buffer_tokens:
                 hot_buffer_count += 1
                 hot_buffer_tokens += tokens
@@ -55,12 +88,24 @@ class CondensationManager:
 
         return uncondensed
 
+    def estimate_uncondensed_tokens(self, user_id: str) -> int:
+        """Cheap estimate of tokens awaiting condensation, computed in SQL.
+
+        Sums character counts in the database (chars/4 approximates tokens)
+        instead of loading every message and running the tokenizer. Suitable
+        for status display, where the exact hot-buffer boundary does not
+        matter.
+        """
+        summaries = self.db.get_condensed_summaries(user_id)
+        start_date = max((s.period_end for s in summaries), default=None)
+        return self.db.sum_message_content_length(user_id, start_date=start_date) // 4
+
     def should_condense(self, user_id: str) -> bool:
         uncondensed = self.get_uncondensed_messages(user_id)
         if not uncondensed:
             return False
 
-        total_tokens = sum(self.estimate_tokens(msg.content) for msg in uncondensed)
+        total_tokens = sum(self.estimate_tokens_batch([msg.content for msg in uncondensed]))
         return total_tokens >= self.chunk_threshold_tokens
 
     def condense_chunk(self, user_id: str, messages: list[Message]) -> CondensedSummary | None:
@@ -129,13 +174,18 @@ class CondensationManager:
             consensus_log = result.to_dict()
         else:
             llm = LLMClient()
-            content = llm.generate(
+            llm_result = llm.generate_result(
                 prompt=prompt_text,
                 model=self.config["models"]["main"],
                 temperature=0.7,
                 max_tokens=2000,
             )
-            consensus_log = None
+            content = llm_result.content
+            # Record how much of the prompt the provider served from its
+            # prefix cache; useful for tuning the condensation template.
+            consensus_log = (
+                {"cached_tokens": llm_result.cached_tokens} if llm_result.cached_tokens is not None else None
+            )
 
         summary = CondensedSummary(
             user_id=user_id,
@@ -147,16 +197,52 @@ class CondensationManager:
             source_word_count=word_count,
             source_summary_ids=[],
             consensus_log=consensus_log,
+            token_count=self.estimate_tokens(content),
         )
 
         return self.db.save_condensed_summary(summary)
 
+    def _split_into_chunks(self, messages: list[Message]) -> list[list[Message]]:
+        """Greedily pack messages into chunks of roughly chunk_threshold_tokens."""
+        chunks: list[list[Message]] = []
+        current: list[Message] = []
+        current_tokens = 0
+        counts = self.estimate_tokens_batch([msg.content for msg in messages])
+        for msg, tokens in zip(messages, counts, strict=True):
+            if current and current_tokens + tokens > self.chunk_threshold_tokens:
+                chunks.append(current)
+                current = []
+                current_tokens = 0
+            current.append(msg)
+            current_tokens += tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def condense_chunks_batch(self, user_id: str, chunks: list[list[Message]]) -> list[CondensedSummary]:
+        """Condense several chunks concurrently.
+
+        Each condensation is a network-bound consensus exchange; a small
+        thread pool overlaps the round-trips instead of serializing them.
+        """
+        chunks = [chunk for chunk in chunks if chunk]
+        if not chunks:
+            return []
+        if len(chunks) == 1:
+            result = self.condense_chunk(user_id, chunks[0])
+            return [result] if result else []
+        with ThreadPoolExecutor(max_workers=min(self.max_prefetch_slots, len(chunks))) as pool:
+            results = pool.map(lambda chunk: self.condense_chunk(user_id, chunk), chunks)
+        return [r for r in results if r]
+
     def should_recurse(self, user_id: str, level: int = 1) -> bool:
         summaries = self.db.get_condensed_summaries(user_id, level=level)
         if len(summaries) <= 1:
             return False
 
-        total_tokens = sum(self.estimate_tokens(s.content) for s in summaries)
+        total_tokens = sum(
+            s.token_count if s.token_count is not None else self.estimate_tokens(s.content) for s in summaries
+        )
         return total_tokens > self.summary_budget_tokens
 
     def condense_summaries(self, user_id: str, level: int) -> CondensedSummary | None:
@@ -220,13 +306,16 @@ class CondensationManager:
             consensus_log = result.to_dict()
         else:
             llm = LLMClient()
-            content = llm.generate(
+            llm_result = llm.generate_result(
                 prompt=prompt_text,
                 model=self.config["models"]["main"],
                 temperature=0.7,
                 max_tokens=2000,
             )
-            consensus_log = None
+            content = llm_result.content
+            consensus_log = (
+                {"cached_tokens": llm_result.cached_tokens} if llm_result.cached_tokens is not None else None
+            )
 
         new_summary = CondensedSummary(
             user_id=user_id,
@@ -238,15 +327,33 @@ class CondensationManager:
             source_word_count=total_word_count,
             source_summary_ids=[s.id for s in batch],
             consensus_log=consensus_log,
+            token_count=self.estimate_tokens(content),
         )
 
         return self.db.save_condensed_summary(new_summary)
 
     def get_context_summaries(self, user_id: str, token_budget: int) -> list[CondensedSummary]:
-        summaries = self.db.get_condensed_summaries(user_id)
+        # Prune in SQL first: chars/4 approximates tokens. Fetch double
+        # the budget's worth, because the selection below may skip an
+        # oversized or covered row and still take later, smaller ones.
+        summaries = self.db.get_summaries_for_budget(user_id, byte_budget=token_budget * 8)
         if not summaries:
             return []
 
+        # Counts are stored at write time; only rows predating the
+        # token_count column still need a tokenizer pass, done as one
+        # batch so the selection loop below is plain dict lookups.
+        token_counts = {s.id: s.token_count for s in summaries if s.token_count is not None}
+        missing = [s for s in summaries if s.token_count is None]
+        if missing:
+            token_counts.update(
+                zip(
+                    (s.id for s in missing),
+                    self.estimate_tokens_batch([s.content for s in missing]),
+                    strict=True,
+                )
+            )
+
         summaries_by_level = {}
         for s in summaries:
             if s.level not in summaries_by_level:
@@ -269,7 +376,7 @@ class CondensationManager:
                 if covered_by_higher:
                     continue
 
-                tokens = self.estimate_tokens(summary.content)
+                tokens = token_counts[summary.id]
                 if current_tokens + tokens <= token_budget:
                     selected.append(summary)
                     current_tokens += tokens
@@ -283,7 +390,9 @@ class CondensationManager:
 
             uncondensed = self.get_uncondensed_messages(user_id)
             if uncondensed:
-                self.condense_chunk(user_id, uncondensed)
+                # Collect every pending chunk first, then dispatch them as
+                # one concurrent batch.
+                self.condense_chunks_batch(user_id, self._split_into_chunks(uncondensed))
 
                 level = 1
                 max_levels = 10
@@ -1,7 +1,5 @@
 from typing import Any
 
-import tiktoken
-
 from src.infrastructure.database import Database
 from src.memory.condensation import CondensationManager
 from src.models.schemas import CondensedSummary, Message
@@ -16,18 +14,20 @@ class ContextBuilder:
         self.summary_budget_tokens = self.condensation_config.get("summary_budget_tokens", 12000)
         self.max_context_tokens = config.get("memory", {}).get("max_context_tokens", 4000)
 
-        self.tokenizer = tiktoken.encoding_for_model("gpt-4")
         self.condensation_manager = CondensationManager(db, config)
+        # Share the manager's encoder and memoized counts rather than
+        # loading a second copy of the same vocabulary.
+        self.tokenizer = self.condensation_manager.tokenizer
 
     def estimate_tokens(self, text: str) -> int:
-        return len(self.tokenizer.encode(text))
+        return self.condensation_manager.estimate_tokens(text)
 
     def build_context(self, user_id: str, max_tokens: int | None = None) -> dict[str, Any]:
         if max_tokens is None:
             max_tokens = self.max_context_tokens
 
         recent_messages = self._get_hot_buffer(user_id)
-        recent_tokens = sum(self.estimate_tokens(msg.content) for msg in recent_messages)
+        recent_tokens = sum(self.condensation_manager.estimate_tokens_batch([m.content for m in recent_messages]))
 
         summary_budget = (max_tokens or 0) - recent_tokens
         summaries = []
@@ -35,12 +35,13 @@ class ContextBuilder:
         if summary_budget > 0:
             summaries = self.condensation_manager.get_context_summaries(user_id, token_budget=summary_budget)
 
+        summary_tokens = sum(self.condensation_manager.estimate_tokens_batch([s.content for s in summaries]))
         return {
             "recent_messages": recent_messages,
             "condensed_summaries": summaries,
-            "total_tokens": recent_tokens + sum(self.estimate_tokens(s.content) for s in summaries),
+            "total_tokens": recent_tokens + summary_tokens,
             "hot_buffer_tokens": recent_tokens,
-            "summary_tokens": sum(self.estimate_tokens(s.content) for s in summaries),
+            "summary_tokens": summary_tokens,
         }
 
     def format_context_string(self, context: dict[str, Any]) -> str:
@@ -67,12 +68,12 @@ class ContextBuilder:
 
     def _get_hot_buffer(self, user_id: str) -> list[Message]:
         all_messages = self.db.get_recent_messages(user_id, limit=100)
+        counts = self.condensation_manager.estimate_tokens_batch([m.content for m in all_messages])
 
         hot_buffer = []
         total_tokens = 0
 
-        for msg in reversed(all_messages):
-            msg_tokens = self.estimate_tokens(msg.content)
+        for msg, msg_tokens in zip(reversed(all_messages), reversed(counts), strict=True):
             if total_tokens + msg_tokens <= self.hot_buffer_tokens:
                 hot_buffer.insert(0, msg)
                 total_tokens += msg_tokens
@@ -82,9 +83,10 @@ class ContextBuilder:
         return hot_buffer
 
     def get_summary_statistics(self, user_id: str) -> dict[str, Any]:
-        summaries = self.db.get_condensed_summaries(user_id)
+        # Aggregated per level in SQL; only #levels rows reach Python.
+        rows = self.db.get_summary_statistics(user_id)
 
-        if not summaries:
+        if not rows:
             return {
                 "total_summaries": 0,
                 "levels": {},
@@ -94,17 +96,11 @@ class ContextBuilder:
                 "latest_period": None,
             }
 
-        levels = {}
-        for s in summaries:
-            if s.level not in levels:
-                levels[s.level] = 0
-            levels[s.level] += 1
-
         return {
-            "total_summaries": len(summaries),
-            "levels": levels,
-            "total_messages_condensed": sum(s.source_message_count for s in summaries),
-            "total_words_condensed": sum(s.source_word_count for s in summaries),
-            "earliest_period": min(s.period_start for s in summaries),
-            "latest_period": max(s.period_end for s in summaries),
+            "total_summaries": sum(r["count"] for r in rows),
+            "levels": {r["level"]: r["count"] for r in rows},
+            "total_messages_condensed": sum(r["messages"] for r in rows),
+            "total_words_condensed": sum(r["words"] for r in rows),
+            "earliest_period": min(r["earliest"] for r in rows),
+            "latest_period": max(r["latest"] for r in rows),
         }
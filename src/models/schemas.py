@@ -75,4 +75,6 @@ class CondensedSummary(BaseModel):
     source_word_count: int
     source_summary_ids: list[str] = Field(default_factory=list)
     consensus_log: dict[str, Any] | None = None
+    # Tokenized once at write time; None for rows predating the column.
+    token_count: int | None = None
     created_at: datetime = Field(default_factory=datetime.now)
@@ -1,4 +1,7 @@
+import hashlib
 import os
+import threading
+import time
 from functools import lru_cache
 
 import httpx
@@ -60,12 +63,44 @@ def verify_supabase_token(token: str) -> dict:
         ) from None
 
 
+# Signature verification is pure CPU and the same bearer token arrives on
+# every request from a client, so verified results are cached briefly. Keys
+# are SHA-256 digests of the token, never the token itself, and an entry
+# never outlives the token's own exp claim.
+_TOKEN_CACHE_TTL_SECONDS = 30
+_TOKEN_CACHE_MAXSIZE = 10000
+_token_cache: dict[bytes, tuple[str, float]] = {}
+_token_cache_lock = threading.Lock()
+
+
 def get_user_id_from_token(credentials: HTTPAuthorizationCredentials) -> str:
-    token = credentials.credentials
+    return get_user_id_from_token_str(credentials.credentials)
+
+
+def get_user_id_from_token_str(token: str) -> str:
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+
     payload = verify_supabase_token(token)
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: missing user ID")
+
+    expires_at = now + _TOKEN_CACHE_TTL_SECONDS
+    token_exp = payload.get("exp")
+    if token_exp is not None:
+        expires_at = min(expires_at, float(token_exp))
+
+    with _token_cache_lock:
+        if len(_token_cache) >= _TOKEN_CACHE_MAXSIZE:
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[key] = (user_id, expires_at)
+
     return user_id
 
 
@@ -1,17 +1,32 @@
+import inspect
+from collections.abc import Iterator
 from dataclasses import dataclass
-from typing import Protocol
+from typing import Any, Protocol
 
 import anthropic
+from anthropic.resources import Messages
 from anthropic.types import Message, TextBlock
 from openai import OpenAI
 from openai.types.chat import ChatCompletionMessageParam
 
+# anthropic 1.x dropped the temperature kwarg from messages.create/stream;
+# probe the installed SDK once so calls work on either side of the break.
+_ANTHROPIC_ACCEPTS_TEMPERATURE = "temperature" in inspect.signature(Messages.create).parameters
+
+
+def anthropic_sampling_kwargs(temperature: float) -> dict[str, Any]:
+    """Sampling kwargs for messages.create/stream on the installed SDK."""
+    if _ANTHROPIC_ACCEPTS_TEMPERATURE:
+        return {"temperature": temperature}
+    return {}
+
 
 @dataclass(frozen=True)
 class LLMResult:
     content: str
     input_tokens: int | None
     output_tokens: int | None
+    cached_tokens: int | None = None
 
 
 class LLMAdapter(Protocol):
@@ -23,8 +38,20 @@ class LLMAdapter(Protocol):
         temperature: float,
         max_tokens: int,
         json_mode: bool,
+        system_suffix: str = "",
     ) -> LLMResult: ...
 
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+        system_suffix: str = "",
+    ) -> Iterator[str]: ...
+
 
 class OpenAIChatAdapter:
     def __init__(self, client: OpenAI):
@@ -38,9 +65,13 @@ class OpenAIChatAdapter:
         temperature: float,
         max_tokens: int,
         json_mode: bool,
+        system_suffix: str = "",
     ) -> LLMResult:
+        # OpenAI caches prompt prefixes automatically, so the stable part of the
+        # system prompt goes first and any per-turn content is appended after it.
+        system_content = f"{system_prompt}\n\n{system_suffix}" if system_suffix else system_prompt
         messages: list[ChatCompletionMessageParam] = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": system_content},
             {"role": "user", "content": prompt},
         ]
 
@@ -63,7 +94,43 @@ class OpenAIChatAdapter:
         usage = response.usage
         input_tokens = usage.prompt_tokens if usage else None
         output_tokens = usage.completion_tokens if usage else None
-        return LLMResult(content=content, input_tokens=input_tokens, output_tokens=output_tokens)
+        prompt_details = getattr(usage, "prompt_tokens_details", None) if usage else None
+        cached_tokens = getattr(prompt_details, "cached_tokens", None) if prompt_details else None
+        return LLMResult(
+            content=content, input_tokens=input_tokens, output_tokens=output_tokens, cached_tokens=cached_tokens
+        )
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+        system_suffix: str = "",
+    ) -> Iterator[str]:
+        system_content = f"{system_prompt}\n\n{system_suffix}" if system_suffix else system_prompt
+        messages: list[ChatCompletionMessageParam] = [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": prompt},
+        ]
+
+        extra: dict[str, Any] = {}
+        if json_mode:
+            extra["response_format"] = {"type": "json_object"}
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            **extra,
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
 
 class AnthropicAdapter:
@@ -78,26 +145,67 @@ class AnthropicAdapter:
         temperature: float,
         max_tokens: int,
         json_mode: bool,
+        system_suffix: str = "",
     ) -> LLMResult:
         json_instruction = "\n\nRespond with valid JSON only." if json_mode else ""
         message_content = prompt + json_instruction
         if system_prompt:
+            # The stable prefix is marked cacheable so repeat turns read it from
+            # the provider-side prompt cache; the variable suffix stays uncached.
+            system_blocks: list[dict[str, Any]] = [
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]
+            if system_suffix:
+                system_blocks.append({"type": "text", "text": system_suffix})
             response: Message = self.client.messages.create(
                 model=model,
                 max_tokens=max_tokens,
-                temperature=temperature,
-                system=system_prompt,
+                system=system_blocks,
                 messages=[{"role": "user", "content": message_content}],
+                **anthropic_sampling_kwargs(temperature),
             )
         else:
             response = self.client.messages.create(
                 model=model,
                 max_tokens=max_tokens,
-                temperature=temperature,
                 messages=[{"role": "user", "content": message_content}],
+                **anthropic_sampling_kwargs(temperature),
             )
         content = "".join(block.text for block in response.content if isinstance(block, TextBlock))
         usage = response.usage
         input_tokens = usage.input_tokens if usage else None
         output_tokens = usage.output_tokens if usage else None
-        return LLMResult(content=content.strip(), input_tokens=input_tokens, output_tokens=output_tokens)
+        cached_tokens = getattr(usage, "cache_read_input_tokens", None) if usage else None
+        return LLMResult(
+            content=content.strip(), input_tokens=input_tokens, output_tokens=output_tokens, cached_tokens=cached_tokens
+        )
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+        system_suffix: str = "",
+    ) -> Iterator[str]:
+        json_instruction = "\n\nRespond with valid JSON only." if json_mode else ""
+        message_content = prompt + json_instruction
+
+        extra: dict[str, Any] = {}
+        if system_prompt:
+            system_blocks: list[dict[str, Any]] = [
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]
+            if system_suffix:
+                system_blocks.append({"type": "text", "text": system_suffix})
+            extra["system"] = system_blocks
+        extra.update(anthropic_sampling_kwargs(temperature))
+        with self.client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": message_content}],
+            **extra,
+        ) as stream:
+            yield from stream.text_stream
@@ -1,22 +1,82 @@
+import hashlib
 import json
 import logging
 import os
-from typing import Any
+import random
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, TypeVar
 
 import anthropic
+import openai
+from diskcache import Cache
 from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
 
-from src.utils.llm_adapter import AnthropicAdapter, LLMAdapter, OpenAIChatAdapter
+from src.utils.llm_adapter import (
+    AnthropicAdapter,
+    LLMAdapter,
+    LLMResult,
+    OpenAIChatAdapter,
+    anthropic_sampling_kwargs,
+)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Client errors where a retry can never succeed - fail fast.
+_FATAL_ERRORS = (
+    openai.BadRequestError,
+    openai.AuthenticationError,
+    openai.PermissionDeniedError,
+    anthropic.BadRequestError,
+    anthropic.AuthenticationError,
+    anthropic.PermissionDeniedError,
+)
+
+# Transient failures worth retrying with backoff.
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    anthropic.RateLimitError,
+    anthropic.APITimeoutError,
+    anthropic.APIConnectionError,
+)
+
+_STATUS_ERRORS = (openai.APIStatusError, anthropic.APIStatusError)
+
+_MAX_ATTEMPTS = 3
+_INITIAL_BACKOFF_SECONDS = 1.0
+_BACKOFF_CAP_SECONDS = 10.0
+
+# Embeddings and temperature-0 completions are deterministic per input, so
+# they survive process restarts on disk instead of being recomputed.
+_CACHE_TTL_SECONDS = 30 * 86400
+_CACHE_SIZE_LIMIT_BYTES = int(2e9)
+
 
 def _is_claude_model(model: str) -> bool:
     model_lower = model.lower()
     return "claude" in model_lower or "sonnet" in model_lower or "opus" in model_lower or "haiku" in model_lower
 
 
+def _retry_after_seconds(error: Exception) -> float | None:
+    """Parse the provider's retry hint from the error response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for header in ("retry-after", "x-ratelimit-reset"):
+        value = headers.get(header)
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    return None
+
+
 class LLMClient:
     def __init__(self, api_key: str | None = None, base_url: str | None = None, timeout: float = 120.0):
         self.base_url = base_url or os.getenv("LLM_BASE_URL")
@@ -41,15 +101,36 @@ class LLMClient:
                 timeout=timeout,
             )
 
-    def _log_usage(self, model: str, client_type: str, input_tokens: int | None, output_tokens: int | None) -> None:
+        self._cache_dir = os.getenv("LLM_CACHE_DIR", "./data/llm_cache")
+        self._emb_cache: Cache | None = None
+        self._response_cache: Cache | None = None
+
+    def _get_cache(self, name: str) -> Cache:
+        # Created lazily so clients that never cache do not touch the disk.
+        attr = f"_{name}_cache"
+        cache = getattr(self, attr)
+        if cache is None:
+            cache = Cache(os.path.join(self._cache_dir, name), size_limit=_CACHE_SIZE_LIMIT_BYTES)
+            setattr(self, attr, cache)
+        return cache
+
+    def _log_usage(
+        self,
+        model: str,
+        client_type: str,
+        input_tokens: int | None,
+        output_tokens: int | None,
+        cached_tokens: int | None = None,
+    ) -> None:
         if input_tokens is None and output_tokens is None:
             return
         logger.info(
-            "LLM tokens: model=%s client=%s input=%s output=%s",
+            "LLM tokens: model=%s client=%s input=%s output=%s cached=%s",
             model,
             client_type,
             input_tokens,
             output_tokens,
+            cached_tokens,
         )
 
     def _get_adapter_for_model(self, model: str) -> tuple[LLMAdapter, str]:
@@ -64,7 +145,43 @@ class LLMClient:
         else:
             raise ValueError("No LLM client configured. Set OPENAI_API_KEY or ANTHROPIC_API_KEY environment variable.")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    def _call_with_retry(self, fn: Callable[[], T]) -> T:
+        """Call `fn`, retrying transient provider failures with decorrelated jitter.
+
+        Honors the provider's Retry-After hint when present and never retries
+        client errors (bad request, auth, permissions) or non-5xx status errors.
+        """
+        last_error: Exception | None = None
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                return fn()
+            except _FATAL_ERRORS:
+                raise
+            except _RETRYABLE_ERRORS as e:
+                last_error = e
+            except _STATUS_ERRORS as e:
+                if e.status_code < 500:
+                    raise
+                last_error = e
+
+            if attempt < _MAX_ATTEMPTS - 1:
+                base = min(_BACKOFF_CAP_SECONDS, _INITIAL_BACKOFF_SECONDS * 2**attempt)
+                delay = random.uniform(base, base * 3)
+                hinted = _retry_after_seconds(last_error)
+                if hinted is not None:
+                    delay = max(hinted, delay)
+                logger.warning(
+                    "LLM call failed (%s), retrying in %.1fs (attempt %d/%d)",
+                    type(last_error).__name__,
+                    delay,
+                    attempt + 1,
+                    _MAX_ATTEMPTS,
+                )
+                time.sleep(delay)
+
+        assert last_error is not None
+        raise last_error
+
     def generate(
         self,
         prompt: str,
@@ -73,30 +190,118 @@ class LLMClient:
         temperature: float = 0.7,
         max_tokens: int = 1000,
         json_mode: bool = False,
+        system_suffix: str = "",
+        cache: bool = False,
     ) -> str:
-        adapter, client_type = self._get_adapter_for_model(model)
-        is_claude = _is_claude_model(model)
-
-        logger.debug(f"LLM request: model={model}, client={client_type}, json_mode={json_mode}")
+        """Generate a completion.
 
-        adapter_json_mode = json_mode if client_type == "anthropic" else json_mode and not is_claude
-        result = adapter.generate(
+        `system_prompt` should hold the stable instructions and is always sent
+        first so provider-side prompt caching can reuse it across turns;
+        per-turn context (user profile, narrative) goes in `system_suffix`.
+        Deterministic calls (temperature 0, or `cache=True`) are served from a
+        persistent on-disk cache when possible.
+        """
+        return self.generate_result(
             prompt=prompt,
             system_prompt=system_prompt,
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
-            json_mode=adapter_json_mode,
+            json_mode=json_mode,
+            system_suffix=system_suffix,
+            cache=cache,
+        ).content
+
+    def generate_result(
+        self,
+        prompt: str,
+        system_prompt: str = "You are a helpful assistant.",
+        model: str = "gpt-4o",
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        json_mode: bool = False,
+        system_suffix: str = "",
+        cache: bool = False,
+    ) -> LLMResult:
+        """Like generate, but keeps the provider's token usage attached.
+
+        Callers that track cost (e.g. cached_tokens from prompt caching)
+        use this; usage fields are None on a local cache hit.
+        """
+        cacheable = cache or temperature == 0
+        cache_key = None
+        if cacheable:
+            cache_key = hashlib.blake2b(
+                f"{model}:{temperature}:{max_tokens}:{json_mode}:{system_prompt}:{system_suffix}:{prompt}".encode()
+            ).hexdigest()
+            cached_content = self._get_cache("response").get(cache_key)
+            if cached_content is not None:
+                return LLMResult(content=cached_content, input_tokens=None, output_tokens=None)
+
+        adapter, client_type = self._get_adapter_for_model(model)
+        is_claude = _is_claude_model(model)
+
+        logger.debug(f"LLM request: model={model}, client={client_type}, json_mode={json_mode}")
+
+        adapter_json_mode = json_mode if client_type == "anthropic" else json_mode and not is_claude
+        result = self._call_with_retry(
+            lambda: adapter.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                json_mode=adapter_json_mode,
+                system_suffix=system_suffix,
+            )
         )
         content = result.content.strip()
 
-        self._log_usage(model, client_type, result.input_tokens, result.output_tokens)
+        self._log_usage(model, client_type, result.input_tokens, result.output_tokens, result.cached_tokens)
         logger.debug(f"LLM response length: {len(content)}, first 200 chars: {content[:200]}")
 
         if not content:
             logger.error("Empty response from LLM")
+        elif cache_key is not None:
+            self._get_cache("response").set(cache_key, content, expire=_CACHE_TTL_SECONDS)
+
+        return LLMResult(
+            content=content,
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+            cached_tokens=result.cached_tokens,
+        )
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str = "You are a helpful assistant.",
+        model: str = "gpt-4o",
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        json_mode: bool = False,
+        system_suffix: str = "",
+    ) -> Iterator[str]:
+        """Yield the completion incrementally as it arrives from the provider.
 
-        return content
+        Lets consumers overlap network transfer with downstream work (parsing,
+        leakage scanning) instead of blocking until the full response is done.
+        """
+        adapter, client_type = self._get_adapter_for_model(model)
+        is_claude = _is_claude_model(model)
+
+        logger.debug(f"LLM stream request: model={model}, client={client_type}, json_mode={json_mode}")
+
+        adapter_json_mode = json_mode if client_type == "anthropic" else json_mode and not is_claude
+        yield from adapter.generate_stream(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_mode=adapter_json_mode,
+            system_suffix=system_suffix,
+        )
 
     def generate_structured(
         self,
@@ -106,10 +311,66 @@ class LLMClient:
         model: str = "gpt-4o",
         temperature: float = 0.7,
     ) -> Any:
-        """Generate structured data using Pydantic model (requires instructor or similar, but here we use JSON mode + parsing)"""
-        # Note: In a real prod app, I'd use the `instructor` library or OpenAI's new structured outputs.
-        # For now, we'll use JSON mode and manual parsing for simplicity and compatibility.
+        """Generate structured data conforming to a Pydantic model.
+
+        Uses provider-native constrained decoding (OpenAI structured outputs,
+        Anthropic tool use) so the schema is enforced server-side instead of
+        pasted into the prompt and parsed on hope. Custom base URLs fall back
+        to JSON mode plus manual parsing for compatibility.
+        """
+        if _is_claude_model(model) and self.anthropic_client:
+            return self._generate_structured_anthropic(prompt, response_model, system_prompt, model, temperature)
+        if self.openai_client and not self.base_url:
+            return self._generate_structured_openai(prompt, response_model, system_prompt, model, temperature)
+        return self._generate_structured_fallback(prompt, response_model, system_prompt, model, temperature)
+
+    def _generate_structured_openai(
+        self, prompt: str, response_model: Any, system_prompt: str, model: str, temperature: float
+    ) -> Any:
+        response = self._call_with_retry(
+            lambda: self.openai_client.beta.chat.completions.parse(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format=response_model,
+                temperature=temperature,
+            )
+        )
+        parsed = response.choices[0].message.parsed
+        if parsed is None:
+            raise ValueError("Model did not return structured output")
+        return parsed
 
+    def _generate_structured_anthropic(
+        self, prompt: str, response_model: Any, system_prompt: str, model: str, temperature: float
+    ) -> Any:
+        tool_name = "emit_structured_output"
+        tool = {
+            "name": tool_name,
+            "description": f"Record a {response_model.__name__} object.",
+            "input_schema": response_model.model_json_schema(),
+        }
+        response = self._call_with_retry(
+            lambda: self.anthropic_client.messages.create(
+                model=model,
+                max_tokens=1000,
+                system=system_prompt,
+                tools=[tool],
+                tool_choice={"type": "tool", "name": tool_name},
+                messages=[{"role": "user", "content": prompt}],
+                **anthropic_sampling_kwargs(temperature),
+            )
+        )
+        for block in response.content:
+            if getattr(block, "type", None) == "tool_use":
+                return response_model(**block.input)
+        raise ValueError("Model did not return structured output")
+
+    def _generate_structured_fallback(
+        self, prompt: str, response_model: Any, system_prompt: str, model: str, temperature: float
+    ) -> Any:
         schema = response_model.model_json_schema()
         json_prompt = (
             f"{prompt}\n\nRespond with a valid JSON object matching this schema:\n{json.dumps(schema, indent=2)}"
@@ -123,12 +384,21 @@ class LLMClient:
             data = json.loads(response_text)
             return response_model(**data)
         except Exception as e:
-            print(f"Failed to parse JSON or validate model: {e}")
-            print(f"Raw response: {response_text}")
+            logger.error(f"Failed to parse JSON or validate model: {e}")
+            logger.error(f"Raw response: {response_text}")
             raise
 
     def get_embedding(self, text: str, model: str = "text-embedding-3-small") -> list[float]:
         if not self.openai_client:
             raise ValueError("Embeddings require OpenAI API. Set OPENAI_API_KEY environment variable.")
         text = text.replace("\n", " ")
-        return self.openai_client.embeddings.create(input=[text], model=model).data[0].embedding
+
+        cache = self._get_cache("emb")
+        key = hashlib.blake2b(f"{model}:{text}".encode()).hexdigest()
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        embedding = self.openai_client.embeddings.create(input=[text], model=model).data[0].embedding
+        cache.set(key, embedding, expire=_CACHE_TTL_SECONDS)
+        return embedding
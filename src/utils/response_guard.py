@@ -1,3 +1,4 @@
+import functools
 import re
 
 
@@ -69,6 +70,12 @@ def contains_sensitive_keywords(response: str) -> bool:
     return False
 
 
+@functools.lru_cache(maxsize=32)
+def _get_guard(protected_text: str, ngram_size: int, threshold: float) -> ResponseGuard:
+    """Build (and memoize) a guard so the protected prompt's n-gram set is extracted once, not per response."""
+    return ResponseGuard(protected_text, ngram_size, threshold)
+
+
 def guard_response(
     response: str, protected_prompt: str, ngram_size: int = 5, threshold: float = 0.3
 ) -> tuple[str, bool]:
@@ -78,7 +85,7 @@ def guard_response(
             True,
         )
 
-    guard = ResponseGuard(protected_prompt, ngram_size, threshold)
+    guard = _get_guard(protected_prompt, ngram_size, threshold)
     leaked, _ = guard.check_leakage(response)
 
     if leaked:
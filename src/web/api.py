@@ -21,20 +21,28 @@ from src.utils.config import load_env
 load_env()
 
 import asyncio
+import functools
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
 logger.info("Starting imports...")  # pragma: no cover
 
-from fastapi import Depends, FastAPI, HTTPException, Request
-from fastapi.security import HTTPAuthorizationCredentials
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
 from src.models.schemas import Message, SemanticInsight, Session
-from src.utils.auth import security
 from src.utils.config import load_config
 
 logger.info("Imports complete, creating app...")  # pragma: no cover
@@ -68,57 +76,201 @@ async def lifespan(app):  # pragma: no cover
     print("=== LIFESPAN START ===", file=sys.stderr, flush=True)
     logger.info("FastAPI lifespan starting")
     _check_env_vars()
+    # Build all services before the server accepts traffic so the first
+    # request doesn't pay import and constructor cost.
+    _init()
     yield
     print("=== LIFESPAN END ===", file=sys.stderr, flush=True)
     logger.info("FastAPI shutdown")
+    _EXECUTOR.shutdown(wait=False, cancel_futures=True)
 
 
-app = FastAPI(title="Stoic Emperor", docs_url="/api/docs", lifespan=lifespan)
+app = FastAPI(
+    title="Stoic Emperor",
+    docs_url="/api/docs",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 logger.info("App created")  # pragma: no cover
 
-_state = {"initialized": False, "config": {}, "db": None, "vectors": None, "brain": None, "condensation": None}
+
+@dataclass(slots=True)
+class AppState:
+    """Process-wide service singletons, built once in _do_init.
+
+    Slotted attribute access is a C-level offset lookup, so the many
+    _state reads per request skip a dict hash each.
+    """
+
+    initialized: bool = False
+    config: dict = field(default_factory=dict)
+    db: Any = None
+    vectors: Any = None
+    brain: Any = None
+    condensation: Any = None
+    episodic: Any = None
+    semantic_cache: Any = None
+    min_summaries_for_profile: int = 3
+
+
+_state = AppState()
+
+
+_init_lock = threading.Lock()
 
 
 def _init():  # pragma: no cover
-    if _state["initialized"]:
+    # Double-checked lock: concurrent cold-start requests must not race to
+    # construct Database/VectorStore twice.
+    if _state.initialized:
         return
+    with _init_lock:
+        if _state.initialized:
+            return
+        _do_init()
+
+
+def _do_init():  # pragma: no cover
+    from src.cache.semantic_cache import SemanticResponseCache
     from src.core.emperor_brain import EmperorBrain
     from src.infrastructure.database import Database
     from src.infrastructure.vector_store import VectorStore
     from src.memory.condensation import CondensationManager
     from src.memory.episodic import EpisodicMemory
 
-    _state["config"] = load_config()
-    _state["db"] = Database(_state["config"]["database"]["url"])
-    _state["vectors"] = VectorStore(_state["config"]["database"]["url"])
-    _state["brain"] = EmperorBrain(config=_state["config"])
-    _state["condensation"] = CondensationManager(_state["db"], _state["config"])
-    _state["episodic"] = EpisodicMemory(
-        _state["db"], _state["vectors"], _state["config"]["memory"]["max_context_tokens"]
-    )
-    _state["initialized"] = True
+    _state.config = load_config()
+    _state.db = Database(_state.config["database"]["url"])
+    _state.vectors = VectorStore(_state.config["database"]["url"])
+    _state.brain = EmperorBrain(config=_state.config)
+    _state.condensation = CondensationManager(_state.db, _state.config)
+    _state.episodic = EpisodicMemory(_state.db, _state.vectors, _state.config["memory"]["max_context_tokens"])
+    _state.semantic_cache = SemanticResponseCache()
+    # Parse config values once instead of chaining dict.get defaults on
+    # every use; a typo in the YAML key surfaces here at startup.
+    aegean = _state.config.get("aegean_consensus", {})
+    _state.min_summaries_for_profile = int(aegean.get("min_summaries_for_profile", 3))
+    # Touch the shared embedder once so numpy's first-call setup happens
+    # at startup rather than inside the first chat request.
+    _state.vectors.embedding_model.encode(["warmup"])
+    _state.initialized = True
+
+
+# One shared executor for all blocking DB/vector/LLM work. asyncio.to_thread
+# uses the default executor, whose size varies by interpreter; a dedicated
+# pool makes the blocking-work concurrency limit explicit.
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="blocking")
+
+
+def _run_blocking(fn, /, *args, **kwargs):
+    # Unlike asyncio.to_thread, this skips the contextvars copy_context/ctx.run
+    # wrapper; no blocking callee here reads context variables.
+    loop = asyncio.get_running_loop()
+    if kwargs:
+        return loop.run_in_executor(_EXECUTOR, functools.partial(fn, *args, **kwargs))
+    return loop.run_in_executor(_EXECUTOR, fn, *args)
+
+
+# User records almost never change, so a short-lived cache saves the
+# SELECT-per-request that every authenticated endpoint otherwise starts with.
+_USER_CACHE_TTL_SECONDS = 300
+_USER_CACHE_MAXSIZE = 1024
+_user_cache: dict = {}
+
+
+def _get_cached_user(user_id: str):
+    cached = _user_cache.get(user_id)
+    if cached is not None and time.time() < cached[1]:
+        return cached[0]
+    user = _state.db.get_or_create_user(user_id)
+    if len(_user_cache) >= _USER_CACHE_MAXSIZE:
+        _user_cache.pop(next(iter(_user_cache)))
+    _user_cache[user_id] = (user, time.time() + _USER_CACHE_TTL_SECONDS)
+    return user
+
+
+# Profiles change only when a background analysis lands, so a few seconds of
+# staleness is fine and spares the read that chat and the profile endpoints
+# both make.
+_PROFILE_CACHE_TTL_SECONDS = 10
+_PROFILE_CACHE_MAXSIZE = 1024
+_profile_cache: dict = {}
+
+
+def _get_cached_profile(user_id: str):
+    cached = _profile_cache.get(user_id)
+    if cached is not None and time.time() < cached[1]:
+        return cached[0]
+    profile = _state.db.get_latest_profile(user_id)
+    if len(_profile_cache) >= _PROFILE_CACHE_MAXSIZE:
+        _profile_cache.pop(next(iter(_profile_cache)))
+    _profile_cache[user_id] = (profile, time.time() + _PROFILE_CACHE_TTL_SECONDS)
+    return profile
+
+
+# Load balancers hit these several times a second; both payloads are fixed
+# for the life of the process, so build them once at import.
+_HEALTH_RESPONSE = {"status": "ok"}
 
 
 @app.get("/health")
 async def health():
-    logger.info("Health check called")
-    return {"status": "ok", "port": os.getenv("PORT", "not set")}
+    return _HEALTH_RESPONSE
 
 
-ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+# Fail closed when unset: a deployment that forgets to set ENVIRONMENT
+# should require auth, not hand out the shared development user.
+ENVIRONMENT = os.getenv("ENVIRONMENT", "production")
 DEFAULT_USER_ID = "default_user"
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY", "")
 
 
-def get_current_user_id(credentials: HTTPAuthorizationCredentials | None = Depends(security)) -> str:
-    if not credentials:
-        raise HTTPException(status_code=401, detail="Authentication required")
-
-    from src.utils.auth import get_user_id_from_token
-
-    return get_user_id_from_token(credentials)
+def get_db():
+    """Dependency handing out the pooled Database.
+
+    Handlers take the database as a parameter instead of reaching into
+    module state, which keeps them testable with a plain override and
+    leaves room to swap per-request sessions in later.
+    """
+    return _state.db
+
+
+@app.middleware("http")
+async def _auth_middleware(request: Request, call_next):
+    """Resolve the bearer token once per request, before routing.
+
+    The verified user id lands on request.state so route dependencies are
+    a plain attribute read; cache hits in the token cache make this a
+    hash lookup. Routes without auth requirements are untouched — the 401
+    decision stays with get_current_user_id.
+    """
+    request.state.user_id = None
+    request.state.auth_error = None
+    auth_header = request.headers.get("authorization")
+    if auth_header and auth_header.lower().startswith("bearer "):
+        from src.utils.auth import get_user_id_from_token_str
+
+        try:
+            request.state.user_id = get_user_id_from_token_str(auth_header[7:])
+        except HTTPException as exc:
+            # A presented token that fails verification is an auth error,
+            # not anonymity; remember it so protected routes reject with
+            # the real detail instead of falling back to the dev user.
+            request.state.auth_error = exc
+    return await call_next(request)
+
+
+def get_current_user_id(request: Request) -> str:
+    user_id = getattr(request.state, "user_id", None)
+    if user_id:
+        return user_id
+    auth_error = getattr(request.state, "auth_error", None)
+    if auth_error is not None:
+        raise auth_error
+    if ENVIRONMENT == "development":
+        return DEFAULT_USER_ID
+    raise HTTPException(status_code=401, detail="Authentication required")
 
 
 static_path = Path(__file__).parent / "static"
@@ -176,98 +328,156 @@ class UpdateNameRequest(BaseModel):
     name: str
 
 
+# The page templates take no per-request data, so each one is rendered once
+# and the HTML is served straight from memory afterwards.
+@functools.cache
+def _render_page(name: str, active_page: str | None = None) -> str:
+    return templates.get_template(name).render(active_page=active_page)
+
+
 @app.get("/")
 async def index(request: Request):
-    return templates.TemplateResponse("chat.html", {"request": request, "active_page": "chat"})
+    return HTMLResponse(_render_page("chat.html", "chat"))
 
 
 @app.get("/login")
 async def login(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return HTMLResponse(_render_page("login.html"))
 
 
 @app.get("/history")
 async def history(request: Request):
-    return templates.TemplateResponse("history.html", {"request": request, "active_page": "history"})
+    return HTMLResponse(_render_page("history.html", "history"))
 
 
 @app.get("/analysis")
 async def analysis(request: Request):
-    return templates.TemplateResponse("analysis.html", {"request": request, "active_page": "analysis"})
+    return HTMLResponse(_render_page("analysis.html", "analysis"))
 
 
 @app.get("/terms")
 async def terms(request: Request):
-    return templates.TemplateResponse("terms.html", {"request": request})
+    return HTMLResponse(_render_page("terms.html"))
+
+
+_CONFIG_RESPONSE = {"supabase_url": SUPABASE_URL, "supabase_anon_key": SUPABASE_ANON_KEY, "environment": ENVIRONMENT}
 
 
 @app.get("/api/config")
 async def get_config():
-    return {"supabase_url": SUPABASE_URL, "supabase_anon_key": SUPABASE_ANON_KEY, "environment": ENVIRONMENT}
+    return _CONFIG_RESPONSE
 
 
 @app.get("/api/user", response_model=UserInfo)
 async def get_user(user_id: str = Depends(get_current_user_id)):
-    _init()
-    user = _state["db"].get_or_create_user(user_id)
+    user = await _run_blocking(_get_cached_user, user_id)
     return UserInfo(id=user.id, name=user.name, created_at=user.created_at)
 
 
 @app.put("/api/user/name", response_model=UserInfo)
 async def update_user_name(request: UpdateNameRequest, user_id: str = Depends(get_current_user_id)):
-    _init()
-    user = _state["db"].update_user_name(user_id, request.name)
+    user = await _run_blocking(_state.db.update_user_name, user_id, request.name)
+    _user_cache.pop(user_id, None)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return UserInfo(id=user.id, name=user.name, created_at=user.created_at)
 
 
+# In-flight chat calls keyed by (user, message digest): a double-clicked send
+# rides the first call's task instead of paying for a second LLM round trip.
+# Single event loop, no await between lookup and insert, so no lock needed.
+_inflight_chats: dict[tuple[str, bytes], asyncio.Task] = {}
+
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, user_id: str = Depends(get_current_user_id)):
-    _init()
-    db = _state["db"]
-    brain = _state["brain"]
-    user = db.get_or_create_user(user_id)
+async def chat(
+    request: ChatRequest,
+    background: BackgroundTasks,
+    user_id: str = Depends(get_current_user_id),
+    db=Depends(get_db),
+):
+    key = (user_id, hashlib.sha256(request.message.encode()).digest())
+    task = _inflight_chats.get(key)
+    if task is None:
+        task = asyncio.create_task(_chat_impl(request, background, user_id, db))
+        _inflight_chats[key] = task
+        task.add_done_callback(lambda _t: _inflight_chats.pop(key, None))
+    return await task
+
+
+async def _chat_impl(
+    request: ChatRequest,
+    background: BackgroundTasks,
+    user_id: str,
+    db,
+):
+    brain = _state.brain
+    user = await _run_blocking(_get_cached_user, user_id)
 
     if request.session_id:
-        session = db.get_session(request.session_id)
+        session = await _run_blocking(db.get_session, request.session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
     else:
-        session = db.get_latest_session(user.id)
+        session = await _run_blocking(db.get_latest_session, user.id)
         if not session:
             session = Session(user_id=user.id)
-            db.create_session(session)
+            await _run_blocking(db.create_session, session)
 
-    history = db.get_session_messages(session.id)
+    history = await _run_blocking(db.get_session_messages, session.id)
 
     user_msg = Message(session_id=session.id, role="user", content=request.message)
     history_with_user = history + [user_msg]
 
-    retrieved_context = _retrieve_context(request.message, user.id)
-    profile = db.get_latest_profile(user.id)
+    # Near-duplicate questions in the same conversational context are served
+    # from the semantic cache without touching retrieval or the LLM.
+    semantic_cache = _state.semantic_cache
+    cache_embedding = None
+    prefix_hash = ""
+    if semantic_cache is not None:
+        try:
+            cache_embedding = await _run_blocking(_embed_cached, request.message)
+            prefix_hash = hashlib.blake2b("\n".join(m.content for m in history[-6:]).encode()).hexdigest()
+            cached_answer = semantic_cache.lookup(cache_embedding, prefix_hash)
+            if cached_answer is not None:
+                cached_msg = Message(session_id=session.id, role="emperor", content=cached_answer)
+                await _run_blocking(db.save_messages, [user_msg, cached_msg])
+                return ChatResponse(response=cached_answer, session_id=session.id, message_id=cached_msg.id)
+        except Exception:
+            cache_embedding = None
+
+    # The three context reads are independent; overlap them.
+    retrieved_context, profile, summaries = await asyncio.gather(
+        _retrieve_context(request.message, user.id),
+        _run_blocking(_get_cached_profile, user.id),
+        _run_blocking(_state.condensation.get_context_summaries, user.id, token_budget=2000),
+    )
     if profile:
         retrieved_context["profile"] = profile["content"]
-
-    summaries = _state["condensation"].get_context_summaries(user.id, token_budget=2000)
     if summaries:
         retrieved_context["narrative"] = "\n\n".join(s.content for s in summaries)
 
-    response = await asyncio.to_thread(
+    response = await _run_blocking(
         brain.respond,
         user_message=request.message,
         conversation_history=history_with_user,
         retrieved_context=retrieved_context,
     )
 
-    db.save_message(user_msg)
     emperor_msg = Message(
         session_id=session.id, role="emperor", content=response.response_text, psych_update=response.psych_update
     )
-    db.save_message(emperor_msg)
+    await _run_blocking(db.save_messages, [user_msg, emperor_msg])
+
+    if semantic_cache is not None and cache_embedding is not None and response.response_text:
+        try:
+            semantic_cache.store(cache_embedding, prefix_hash, response.response_text)
+        except Exception:
+            pass
 
     try:
-        _state["episodic"].store_turn(
+        await _run_blocking(
+            _state.episodic.store_turn,
             user_id=user.id,
             session_id=session.id,
             user_message=request.message,
@@ -277,81 +487,150 @@ async def chat(request: ChatRequest, user_id: str = Depends(get_current_user_id)
         pass
 
     if response.psych_update.semantic_assertions:
-        vectors = _state["vectors"]
-        for assertion in response.psych_update.semantic_assertions:
-            if assertion.confidence >= 0.5:
-                try:
-                    insight = SemanticInsight(
-                        user_id=user.id,
-                        source_message_id=emperor_msg.id,
-                        assertion=assertion.text,
-                        confidence=assertion.confidence,
-                    )
-                    db.save_semantic_insight(insight)
-                    vectors.add(
-                        collection="semantic",
-                        ids=[insight.id],
-                        documents=[assertion.text],
-                        metadatas=[
-                            {
-                                "user_id": user.id,
-                                "source_message_id": emperor_msg.id,
-                                "confidence": assertion.confidence,
-                            }
-                        ],
-                    )
-                except Exception:
-                    pass
-
-    _maybe_condense_and_analyze(user.id)
+        insights = [
+            SemanticInsight(
+                user_id=user.id,
+                source_message_id=emperor_msg.id,
+                assertion=assertion.text,
+                confidence=assertion.confidence,
+            )
+            for assertion in response.psych_update.semantic_assertions
+            if assertion.confidence >= 0.5
+        ]
+        if insights:
+            try:
+                await _run_blocking(db.save_semantic_insights, insights)
+                await _run_blocking(
+                    _state.vectors.add,
+                    collection="semantic",
+                    ids=[i.id for i in insights],
+                    documents=[i.assertion for i in insights],
+                    metadatas=[
+                        {
+                            "user_id": user.id,
+                            "source_message_id": emperor_msg.id,
+                            "confidence": i.confidence,
+                        }
+                        for i in insights
+                    ],
+                )
+            except Exception:
+                pass
+
+    # Condensation and profile analysis can take multiple LLM calls; run
+    # them after the response has been sent.
+    _enqueue_analysis(background, user.id)
 
     return ChatResponse(response=response.response_text, session_id=session.id, message_id=emperor_msg.id)
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest, user_id: str = Depends(get_current_user_id), db=Depends(get_db)):
+    """Stream the reply as server-sent events while retrieval overlaps.
+
+    Tokens are flushed as the model produces them, so time-to-first-token is
+    roughly embed+retrieval latency rather than the full completion. The
+    streaming path skips the structured psych update; the assembled reply is
+    persisted when the stream finishes.
+    """
+    brain = _state.brain
+    user = await _run_blocking(_get_cached_user, user_id)
+
+    if request.session_id:
+        session = await _run_blocking(db.get_session, request.session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+    else:
+        session = await _run_blocking(db.get_latest_session, user.id)
+        if not session:
+            session = Session(user_id=user.id)
+            await _run_blocking(db.create_session, session)
+
+    # Kick retrieval off before the response starts so it runs while the
+    # stream headers flush and history loads.
+    retrieval_task = asyncio.create_task(_retrieve_context(request.message, user.id))
+    history = await _run_blocking(db.get_session_messages, session.id)
+
+    user_msg = Message(session_id=session.id, role="user", content=request.message)
+    history_with_user = history + [user_msg]
+
+    async def event_stream():
+        chunks: list[str] = []
+        completed = False
+        try:
+            retrieved_context, profile, summaries = await asyncio.gather(
+                retrieval_task,
+                _run_blocking(_get_cached_profile, user.id),
+                _run_blocking(_state.condensation.get_context_summaries, user.id, token_budget=2000),
+            )
+            if profile:
+                retrieved_context["profile"] = profile["content"]
+            if summaries:
+                retrieved_context["narrative"] = "\n\n".join(s.content for s in summaries)
+
+            stream = brain.respond_stream(
+                user_message=request.message,
+                conversation_history=history_with_user,
+                retrieved_context=retrieved_context,
+            )
+            while True:
+                token = await _run_blocking(next, stream, None)
+                if token is None:
+                    break
+                chunks.append(token)
+                yield f"data: {json.dumps({'delta': token})}\n\n"
+            completed = True
+        finally:
+            # A failure before the first token has no emperor turn worth
+            # recording; persisting an empty one would corrupt every later
+            # context build for the session. The user message is kept
+            # either way.
+            to_save = [user_msg]
+            if completed or chunks:
+                emperor_msg = Message(session_id=session.id, role="emperor", content="".join(chunks))
+                to_save.append(emperor_msg)
+            await _run_blocking(db.save_messages, to_save)
+
+        yield f"data: {json.dumps({'done': True, 'session_id': session.id, 'message_id': emperor_msg.id})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/api/sessions", response_model=SessionInfo)
-async def create_session(user_id: str = Depends(get_current_user_id)):
-    _init()
-    db = _state["db"]
-    user = db.get_or_create_user(user_id)
+async def create_session(user_id: str = Depends(get_current_user_id), db=Depends(get_db)):
+    user = await _run_blocking(_get_cached_user, user_id)
     session = Session(user_id=user.id)
-    db.create_session(session)
+    await _run_blocking(db.create_session, session)
     return SessionInfo(id=session.id, created_at=session.created_at, message_count=0)
 
 
-@app.get("/api/sessions", response_model=list[SessionInfo])
-async def list_sessions(user_id: str = Depends(get_current_user_id)):
-    _init()
-    db = _state["db"]
-    user = db.get_or_create_user(user_id)
-    rows = db.get_user_sessions_with_counts(user.id)
-    return [
-        SessionInfo(
-            id=row["id"],
-            created_at=row["created_at"],
-            message_count=row["message_count"],
-        )
-        for row in rows
-    ]
+# The two list endpoints hand their rows straight to orjson: the values come
+# from our own DB layer, so the egress Pydantic pass is pure overhead. The
+# models stay in the decorators' responses= so OpenAPI still documents them.
+@app.get("/api/sessions", responses={200: {"model": list[SessionInfo]}})
+async def list_sessions(user_id: str = Depends(get_current_user_id), db=Depends(get_db)):
+    user = await _run_blocking(_get_cached_user, user_id)
+    rows = await _run_blocking(db.get_user_sessions_with_counts, user.id)
+    return ORJSONResponse(
+        [{"id": row["id"], "created_at": row["created_at"], "message_count": row["message_count"]} for row in rows]
+    )
 
 
-@app.get("/api/sessions/{session_id}/messages", response_model=list[MessageInfo])
-async def get_session_messages(session_id: str):
-    _init()
-    db = _state["db"]
-    session = db.get_session(session_id)
+@app.get("/api/sessions/{session_id}/messages", responses={200: {"model": list[MessageInfo]}})
+async def get_session_messages(session_id: str, db=Depends(get_db)):
+    session, messages = await _run_blocking(db.get_session_with_messages, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    messages = db.get_session_messages(session_id)
-    return [MessageInfo(id=m.id, role=m.role, content=m.content, created_at=m.created_at) for m in messages]
+    return ORJSONResponse(
+        [{"id": m.id, "role": m.role, "content": m.content, "created_at": m.created_at} for m in messages]
+    )
 
 
 @app.get("/api/profile", response_model=ProfileInfo | None)
-async def get_profile(user_id: str = Depends(get_current_user_id)):
-    _init()
-    db = _state["db"]
-    user = db.get_or_create_user(user_id)
-    profile = db.get_latest_profile(user.id)
+async def get_profile(user_id: str = Depends(get_current_user_id), db=Depends(get_db)):
+    user = await _run_blocking(_get_cached_user, user_id)
+    profile = await _run_blocking(_get_cached_profile, user.id)
     if not profile:
         return None
 
@@ -376,15 +655,12 @@ async def get_profile(user_id: str = Depends(get_current_user_id)):
 
 
 @app.get("/api/analysis/status", response_model=AnalysisStatus)
-async def get_analysis_status(user_id: str = Depends(get_current_user_id)):
-    _init()
-    db = _state["db"]
-    condensation = _state["condensation"]
-    user = db.get_or_create_user(user_id)
-    uncondensed = condensation.get_uncondensed_messages(user.id)
-    uncondensed_tokens = sum(condensation.estimate_tokens(m.content) for m in uncondensed)
-    summaries = db.get_condensed_summaries(user.id)
-    profile = db.get_latest_profile(user.id)
+async def get_analysis_status(user_id: str = Depends(get_current_user_id), db=Depends(get_db)):
+    condensation = _state.condensation
+    user = await _run_blocking(_get_cached_user, user_id)
+    uncondensed_tokens = await _run_blocking(condensation.estimate_uncondensed_tokens, user.id)
+    summaries = await _run_blocking(db.get_condensed_summaries, user.id)
+    profile = await _run_blocking(_get_cached_profile, user.id)
 
     return AnalysisStatus(
         uncondensed_tokens=uncondensed_tokens,
@@ -394,19 +670,41 @@ async def get_analysis_status(user_id: str = Depends(get_current_user_id)):
     )
 
 
+_analysis_locks: dict[str, threading.Lock] = {}
+# Cap analyses running at once across all users so a burst of chats cannot
+# saturate the CPU with concurrent LLM condensation runs.
+_analysis_semaphore = threading.BoundedSemaphore(2)
+
+
+def _enqueue_analysis(background: BackgroundTasks, user_id: str) -> None:
+    # No request-side bookkeeping: Starlette only runs background tasks
+    # after the response body is sent, so any pending-state written here
+    # would leak if the response never completes. Duplicates are shed
+    # inside the task by the non-blocking per-user lock, at the cost of a
+    # no-op task object instead of a permanently stuck entry.
+    background.add_task(_maybe_condense_and_analyze, user_id)
+
+
 def _maybe_condense_and_analyze(user_id: str) -> None:  # pragma: no cover
+    # One analysis per user at a time; a second chat landing mid-run just
+    # skips the check rather than queueing a duplicate.
+    lock = _analysis_locks.setdefault(user_id, threading.Lock())
+    if not lock.acquire(blocking=False):
+        return
     try:
-        did_condense = _state["condensation"].maybe_condense(user_id, verbose=False)
-        if did_condense:
-            _maybe_update_profile(user_id)
+        with _analysis_semaphore:
+            did_condense = _state.condensation.maybe_condense(user_id, verbose=False)
+            if did_condense:
+                _maybe_update_profile(user_id)
     except Exception:
         pass
+    finally:
+        lock.release()
 
 
 def _maybe_update_profile(user_id: str) -> None:  # pragma: no cover
-    config = _state["config"]
-    db = _state["db"]
-    min_summaries = config.get("aegean_consensus", {}).get("min_summaries_for_profile", 3)
+    db = _state.db
+    min_summaries = _state.min_summaries_for_profile
     summaries = db.get_condensed_summaries(user_id)
     if len(summaries) < min_summaries:
         return
@@ -430,44 +728,91 @@ def _maybe_update_profile(user_id: str) -> None:  # pragma: no cover
         pass
 
 
-def _retrieve_context(user_message: str, user_id: str) -> dict:  # pragma: no cover
-    brain = _state["brain"]
-    vectors = _state["vectors"]
+@lru_cache(maxsize=1024)
+def _expand_query_cached(user_message: str) -> str:  # pragma: no cover
+    return _state.brain.expand_query(user_message)
+
+
+# Retrieval is deterministic in (query, user) and repeat questions are
+# common in multi-turn chats; a short TTL bounds how stale the retrieved
+# context can get as new insights land.
+_RETRIEVAL_CACHE_TTL_SECONDS = 300
+_RETRIEVAL_CACHE_MAXSIZE = 2048
+_retrieval_cache: dict = {}
+_retrieval_cache_lock = threading.Lock()
+
+
+def _retrieval_cache_get(key):
+    with _retrieval_cache_lock:
+        cached = _retrieval_cache.get(key)
+        if cached is not None and time.time() < cached[1]:
+            return dict(cached[0])
+    return None
+
+
+def _retrieval_cache_put(key, context: dict) -> None:
+    with _retrieval_cache_lock:
+        if len(_retrieval_cache) >= _RETRIEVAL_CACHE_MAXSIZE:
+            _retrieval_cache.pop(next(iter(_retrieval_cache)))
+        _retrieval_cache[key] = (dict(context), time.time() + _RETRIEVAL_CACHE_TTL_SECONDS)
+
+
+@lru_cache(maxsize=1024)
+def _embed_cached(text: str) -> tuple[float, ...]:  # pragma: no cover
+    return tuple(_state.vectors.embedding_model.encode([text])[0])
+
+
+async def _retrieve_context(user_message: str, user_id: str) -> dict:  # pragma: no cover
+    vectors = _state.vectors
     context = {"stoic": [], "psych": [], "insights": [], "episodic": []}
 
     try:
-        expanded = brain.expand_query(user_message)
+        expanded = await _run_blocking(_expand_query_cached, user_message)
         query_terms = [t.strip() for t in expanded.split(",")]
         query_text = " ".join(query_terms) if query_terms else user_message
     except Exception:
         query_text = user_message
 
-    try:
-        stoic_results = vectors.query("stoic_wisdom", query_texts=[query_text], n_results=3)
-        if stoic_results.get("documents") and stoic_results["documents"][0]:
-            context["stoic"] = stoic_results["documents"][0]
-    except Exception:
-        pass
+    cache_key = (query_text, user_id)
+    cached_context = _retrieval_cache_get(cache_key)
+    if cached_context is not None:
+        return cached_context
 
+    # Encode the query once and share the vector across all collection
+    # lookups instead of re-embedding the same string per query.
     try:
-        psych_results = vectors.query("psychoanalysis", query_texts=[query_text], n_results=3)
-        if psych_results.get("documents") and psych_results["documents"][0]:
-            context["psych"] = psych_results["documents"][0]
+        query_embedding = list(await _run_blocking(_embed_cached, query_text))
     except Exception:
-        pass
+        query_embedding = None
 
+    if query_embedding:
+        query_kwargs = {"query_embeddings": [query_embedding]}
+    else:
+        query_kwargs = {"query_texts": [query_text]}
+
+    # All four collection lookups share one embedding and one connection
+    # via query_batch, so retrieval is a single round-trip to the store.
+    lookups = [
+        ("stoic", "stoic_wisdom", 3, None),
+        ("psych", "psychoanalysis", 3, None),
+        ("insights", "semantic", 5, {"user_id": user_id}),
+        ("episodic", "episodic", 3, {"user_id": user_id}),
+    ]
     try:
-        insight_results = vectors.query("semantic", query_texts=[query_text], n_results=5, where={"user_id": user_id})
-        if insight_results.get("documents") and insight_results["documents"][0]:
-            context["insights"] = insight_results["documents"][0]
+        batched = await _run_blocking(
+            vectors.query_batch,
+            [collection for _, collection, _, _ in lookups],
+            **query_kwargs,
+            n_results=[n for _, _, n, _ in lookups],
+            wheres=[where for _, _, _, where in lookups],
+        )
     except Exception:
-        pass
+        return context
 
-    try:
-        episodic_results = vectors.query("episodic", query_texts=[query_text], n_results=3, where={"user_id": user_id})
-        if episodic_results.get("documents") and episodic_results["documents"][0]:
-            context["episodic"] = episodic_results["documents"][0]
-    except Exception:
-        pass
+    for key, collection, _, _ in lookups:
+        result = batched.get(collection, {})
+        if result.get("documents") and result["documents"][0]:
+            context[key] = result["documents"][0]
 
+    _retrieval_cache_put(cache_key, context)
     return context
@@ -2,10 +2,51 @@ import os
 import shutil
 import tempfile
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
 
 
+def make_chat_response(content):
+    """Chat-completions response stub with the attribute shape adapters read.
+
+    SimpleNamespace skips MagicMock's per-instance descriptor setup;
+    usage=None matches the adapters' no-usage fallback path.
+    """
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def make_llm_client(default_content="Test output"):
+    """MagicMock OpenAI-style client whose create already answers."""
+    client = MagicMock()
+    client.chat.completions.create.return_value = make_chat_response(default_content)
+    return client
+
+
+# The FastAPI app and its ASGI transport are stateless across tests; build
+# them once per session and let api fixtures swap only the mocked _state.
+@pytest.fixture(scope="session")
+def _app():
+    from src.web.api import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+def _client(_app):
+    from fastapi.testclient import TestClient
+
+    import src.web.api as api_module
+
+    # Entering the client context runs the ASGI lifespan exactly once for
+    # the session. _init early-returns on the initialized flag, so startup
+    # never builds real services here; tests swap in their own _state.
+    api_module._state.initialized = True
+    with TestClient(_app) as client:
+        yield client
+
+
 @pytest.fixture
 def temp_dir():
     dirpath = tempfile.mkdtemp()
@@ -13,9 +54,37 @@ def temp_dir():
     shutil.rmtree(dirpath)
 
 
+# One shared in-memory SQLite for the whole session: every Database()
+# built from _MEMORY_DB_URL attaches to the same database, so tests skip
+# the per-test file creation and most of the schema bootstrap.
+_MEMORY_DB_URL = "sqlite:///file:stoic-emperor-tests?mode=memory&cache=shared&uri=true"
+
+
+@pytest.fixture(scope="session")
+def _memory_db_keepalive():
+    import sqlite3
+
+    # A shared-cache memory database lives only while at least one
+    # connection is open; hold one for the whole session.
+    conn = sqlite3.connect("file:stoic-emperor-tests?mode=memory&cache=shared", uri=True)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def _memory_db(_memory_db_keepalive):
+    # Wipe data between tests; schema_version stays so re-init is cheap.
+    cursor = _memory_db_keepalive.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name != 'schema_version'"
+    )
+    for (table,) in cursor.fetchall():
+        _memory_db_keepalive.execute(f"DELETE FROM {table}")
+    _memory_db_keepalive.commit()
+
+
 @pytest.fixture
-def test_db_path(temp_dir):
-    return str(temp_dir / "test_stoic_emperor.db")
+def test_db_path(_memory_db):
+    return _MEMORY_DB_URL
 
 
 @pytest.fixture
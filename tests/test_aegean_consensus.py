@@ -1,10 +1,29 @@
+import itertools
 import json
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
+import orjson
 import pytest
 
 from src.core.aegean_consensus import AegeanConsensusProtocol, ConsensusResult, ConsensusRound
+from tests.conftest import make_chat_response, make_llm_client
+
+# Review payloads serialized once at collection time; the tests only need
+# the JSON strings, not a fresh dumps per run.
+_APPROVED_REVIEW_JSON = json.dumps(
+    {"approved": True, "strengths": ["clear", "accurate"], "concerns": [], "reasoning": "Good analysis"}
+)
+_CONSENSUS_APPROVED_JSON = json.dumps({"approved": True, "strengths": ["good"], "concerns": [], "reasoning": "OK"})
+_REJECTED_CRITICAL_JSON = json.dumps(
+    {
+        "approved": False,
+        "strengths": [],
+        "concerns": [{"issue": "bad", "severity": "critical"}],
+        "reasoning": "Not good",
+    }
+)
+_REJECTED_JSON = json.dumps({"approved": False, "strengths": [], "concerns": [], "reasoning": "Not approved"})
 
 
 class TestConsensusRound:
@@ -88,70 +107,90 @@ class TestConsensusResult:
 
 
 class TestAegeanConsensusProtocol:
-    @pytest.fixture
+    # Module scope: the protocol (patching, prompt wiring, output folder
+    # mkdir) is built once for the ~20 tests below; the autouse fixture
+    # wipes whatever a test configured on the shared client.
+    @pytest.fixture(scope="module")
     def mock_openai_client(self):
-        mock_client = MagicMock()
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "Test output"
-        mock_client.chat.completions.create.return_value = mock_response
-        return mock_client
-
-    @pytest.fixture
-    def consensus_protocol(self, temp_dir):
-        with patch("src.core.aegean_consensus.OpenAI") as mock_openai:
-            mock_client = MagicMock()
-            mock_openai.return_value = mock_client
+        return make_llm_client()
+
+    @pytest.fixture(scope="module")
+    def consensus_protocol(self, tmp_path_factory):
+        mock_client = make_llm_client()
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr("src.core.aegean_consensus.OpenAI", lambda *args, **kwargs: mock_client)
+            # Without this, a host with ANTHROPIC_API_KEY set would route
+            # the claude-3 side through a real Anthropic client instead of
+            # the mocked OpenAI-compatible one.
+            mp.delenv("ANTHROPIC_API_KEY", raising=False)
             protocol = AegeanConsensusProtocol(
                 model_a="gpt-4",
                 model_b="claude-3",
                 prompts={"test_prompt": "Test: {input}"},
                 beta_threshold=2,
                 verbose=False,
-                output_folder=str(temp_dir / "consensus_logs"),
+                output_folder=str(tmp_path_factory.mktemp("consensus_logs")),
             )
             protocol.openai_client = mock_client
             return protocol
 
-    def test_initialization(self, temp_dir):
-        with patch("src.core.aegean_consensus.OpenAI"):
-            protocol = AegeanConsensusProtocol(
-                model_a="gpt-4",
-                model_b="claude-3",
-                prompts={"test": "template"},
-                beta_threshold=3,
-                alpha_quorum=0.8,
-                verbose=False,
-                output_folder=str(temp_dir / "logs"),
-            )
+    # Canned responses shared by the reach_consensus tests; built once and
+    # cycled via side_effect rather than re-allocated per mock call.
+    @pytest.fixture(scope="module")
+    def consensus_responses(self):
+        return {
+            "generated": make_chat_response("Generated output"),
+            "approved": make_chat_response(_CONSENSUS_APPROVED_JSON),
+            "rejected_critical": make_chat_response(_REJECTED_CRITICAL_JSON),
+            "rejected": make_chat_response(_REJECTED_JSON),
+        }
+
+    @pytest.fixture(autouse=True)
+    def _reset_openai_mock(self, consensus_protocol):
+        yield
+        # Reset the call mock itself, not the whole client: a recursive
+        # reset_mock(return_value=True) also wipes MagicMock's magic-method
+        # defaults (e.g. __bool__), which the protocol relies on.
+        consensus_protocol.openai_client.chat.completions.create.reset_mock(return_value=True, side_effect=True)
+
+    def test_initialization(self, temp_dir, monkeypatch):
+        monkeypatch.setattr("src.core.aegean_consensus.OpenAI", lambda *args, **kwargs: MagicMock())
+        protocol = AegeanConsensusProtocol(
+            model_a="gpt-4",
+            model_b="claude-3",
+            prompts={"test": "template"},
+            beta_threshold=3,
+            alpha_quorum=0.8,
+            verbose=False,
+            output_folder=str(temp_dir / "logs"),
+        )
 
-            assert protocol.model_a == "gpt-4"
-            assert protocol.model_b == "claude-3"
-            assert protocol.beta_threshold == 3
-            assert protocol.alpha_quorum == 0.8
-            assert protocol.prompts == {"test": "template"}
+        assert protocol.model_a == "gpt-4"
+        assert protocol.model_b == "claude-3"
+        assert protocol.beta_threshold == 3
+        assert protocol.alpha_quorum == 0.8
+        assert protocol.prompts == {"test": "template"}
 
-    def test_load_prompts_file_exists(self, temp_dir):
+    def test_load_prompts_file_exists(self, temp_dir, monkeypatch):
         prompts_content = "test_prompt: 'Test template'\n"
         prompts_path = temp_dir / "config"
         prompts_path.mkdir()
         (prompts_path / "prompts.yaml").write_text(prompts_content)
 
-        with patch("src.core.aegean_consensus.OpenAI"), patch("src.core.aegean_consensus.Path") as mock_path:
-            mock_path.return_value.exists.return_value = False
-            protocol = AegeanConsensusProtocol(
-                model_a="gpt-4",
-                model_b="claude-3",
-                verbose=False,
-                output_folder=str(temp_dir / "logs"),
-            )
-            assert isinstance(protocol.prompts, dict)
+        mock_path = MagicMock()
+        mock_path.return_value.exists.return_value = False
+        monkeypatch.setattr("src.core.aegean_consensus.OpenAI", lambda *args, **kwargs: MagicMock())
+        monkeypatch.setattr("src.core.aegean_consensus.Path", mock_path)
+        protocol = AegeanConsensusProtocol(
+            model_a="gpt-4",
+            model_b="claude-3",
+            verbose=False,
+            output_folder=str(temp_dir / "logs"),
+        )
+        assert isinstance(protocol.prompts, dict)
 
     def test_generate(self, consensus_protocol):
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "Generated content"
-        consensus_protocol.openai_client.chat.completions.create.return_value = mock_response
+        consensus_protocol.openai_client.chat.completions.create.return_value = make_chat_response("Generated content")
 
         result = consensus_protocol._generate(
             "gpt-4",
@@ -173,17 +212,9 @@ class TestAegeanConsensusProtocol:
             )
 
     def test_review_output_valid_json(self, consensus_protocol):
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps(
-            {
-                "approved": True,
-                "strengths": ["clear", "accurate"],
-                "concerns": [],
-                "reasoning": "Good analysis",
-            }
+        consensus_protocol.openai_client.chat.completions.create.return_value = make_chat_response(
+            _APPROVED_REVIEW_JSON
         )
-        consensus_protocol.openai_client.chat.completions.create.return_value = mock_response
 
         result = consensus_protocol._review_output(
             "gpt-4",
@@ -197,10 +228,9 @@ class TestAegeanConsensusProtocol:
         assert "strengths" in result
 
     def test_review_output_invalid_json(self, consensus_protocol):
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "Not valid JSON at all"
-        consensus_protocol.openai_client.chat.completions.create.return_value = mock_response
+        consensus_protocol.openai_client.chat.completions.create.return_value = make_chat_response(
+            "Not valid JSON at all"
+        )
 
         result = consensus_protocol._review_output(
             "gpt-4",
@@ -213,21 +243,17 @@ class TestAegeanConsensusProtocol:
         assert result["approved"] is False
         assert "reasoning" in result
 
-    def test_merge_outputs_a_stronger(self, consensus_protocol):
-        review_a = {"strengths": ["1"]}
-        review_b = {"strengths": ["1", "2", "3"]}
-
+    @pytest.mark.parametrize(
+        ("review_a", "review_b", "expected"),
+        [
+            ({"strengths": ["1"]}, {"strengths": ["1", "2", "3"]}, "Output A"),
+            ({"strengths": ["1", "2", "3", "4"]}, {"strengths": ["1"]}, "Output B"),
+        ],
+    )
+    def test_merge_outputs(self, consensus_protocol, review_a, review_b, expected):
         result = consensus_protocol._merge_outputs("Output A", "Output B", review_a, review_b)
 
-        assert result == "Output A"
-
-    def test_merge_outputs_b_stronger(self, consensus_protocol):
-        review_a = {"strengths": ["1", "2", "3", "4"]}
-        review_b = {"strengths": ["1"]}
-
-        result = consensus_protocol._merge_outputs("Output A", "Output B", review_a, review_b)
-
-        assert result == "Output B"
+        assert result == expected
 
     def test_update_variables_with_feedback(self, consensus_protocol):
         variables = {"input": "original", "other": "value"}
@@ -277,29 +303,23 @@ class TestAegeanConsensusProtocol:
         assert len(result) == 1
         assert "depression" in result[0]
 
-    def test_calculate_stability_score_empty(self, consensus_protocol):
-        result = consensus_protocol._calculate_stability_score([])
-        assert result == 0.0
-
-    def test_calculate_stability_score_all_consensus(self, consensus_protocol):
+    @pytest.mark.parametrize(
+        ("consensus_flags", "expected"),
+        [
+            ([], 0.0),
+            ([True, True], 1.0),
+            ([True, False], 0.5),
+        ],
+    )
+    def test_calculate_stability_score(self, consensus_protocol, consensus_flags, expected):
         rounds = [
-            ConsensusRound(round_number=1, model_a_output="A", model_b_output="B", consensus_reached=True),
-            ConsensusRound(round_number=2, model_a_output="A", model_b_output="B", consensus_reached=True),
-        ]
-
-        result = consensus_protocol._calculate_stability_score(rounds)
-
-        assert result == 1.0
-
-    def test_calculate_stability_score_mixed(self, consensus_protocol):
-        rounds = [
-            ConsensusRound(round_number=1, model_a_output="A", model_b_output="B", consensus_reached=True),
-            ConsensusRound(round_number=2, model_a_output="A", model_b_output="B", consensus_reached=False),
+            ConsensusRound(round_number=i + 1, model_a_output="A", model_b_output="B", consensus_reached=flag)
+            for i, flag in enumerate(consensus_flags)
         ]
 
         result = consensus_protocol._calculate_stability_score(rounds)
 
-        assert result == 0.5
+        assert result == expected
 
     def test_log_consensus(self, consensus_protocol, temp_dir):
         result = ConsensusResult(
@@ -314,124 +334,38 @@ class TestAegeanConsensusProtocol:
         log_path = consensus_protocol._log_consensus(result, "test_prompt")
 
         assert log_path.exists()
-        with open(log_path) as f:
-            log_data = json.load(f)
+        log_data = orjson.loads(log_path.read_bytes())
         assert log_data["consensus_reached"] is True
 
-    def test_reach_consensus_success(self, consensus_protocol):
-        def make_generate_response():
-            r = MagicMock()
-            r.choices = [MagicMock()]
-            r.choices[0].message.content = "Generated output"
-            return r
-
-        def make_review_response():
-            r = MagicMock()
-            r.choices = [MagicMock()]
-            r.choices[0].message.content = json.dumps(
-                {
-                    "approved": True,
-                    "strengths": ["good"],
-                    "concerns": [],
-                    "reasoning": "OK",
-                }
-            )
-            return r
-
-        call_count = {"calls": 0}
-
-        def side_effect(*args, **kwargs):
-            call_count["calls"] += 1
-            if call_count["calls"] % 2 == 1:
-                return make_generate_response()
-            return make_review_response()
-
-        consensus_protocol.openai_client.chat.completions.create.side_effect = side_effect
-
-        result = consensus_protocol.reach_consensus(
-            prompt_name="test_prompt",
-            variables={"input": "test"},
-            max_rounds=2,
-        )
-
-        assert isinstance(result, ConsensusResult)
-
-    def test_reach_consensus_no_consensus(self, consensus_protocol):
-        def make_generate_response():
-            r = MagicMock()
-            r.choices = [MagicMock()]
-            r.choices[0].message.content = "Generated output"
-            return r
-
-        def make_review_response():
-            r = MagicMock()
-            r.choices = [MagicMock()]
-            r.choices[0].message.content = json.dumps(
-                {
-                    "approved": False,
-                    "strengths": [],
-                    "concerns": [{"issue": "bad", "severity": "critical"}],
-                    "reasoning": "Not good",
-                }
-            )
-            return r
-
-        call_count = {"calls": 0}
-
-        def side_effect(*args, **kwargs):
-            call_count["calls"] += 1
-            if call_count["calls"] % 2 == 1:
-                return make_generate_response()
-            return make_review_response()
-
-        consensus_protocol.openai_client.chat.completions.create.side_effect = side_effect
-
-        result = consensus_protocol.reach_consensus(
-            prompt_name="test_prompt",
-            variables={"input": "test"},
-            max_rounds=1,
-            use_model_a_on_failure=True,
+    @pytest.mark.parametrize(
+        ("review", "max_rounds", "fallback", "expected_consensus", "expected_final"),
+        [
+            ("approved", 2, True, True, "Generated output"),
+            ("rejected_critical", 1, True, False, "Generated output"),
+            ("rejected", 1, False, False, "Manual Review Required"),
+        ],
+    )
+    def test_reach_consensus(
+        self, consensus_protocol, consensus_responses, review, max_rounds, fallback, expected_consensus, expected_final
+    ):
+        # Four mocked calls per round: generate A, generate B, then the two
+        # cross-reviews; the cycle has to follow that call order.
+        consensus_protocol.openai_client.chat.completions.create.side_effect = itertools.cycle(
+            [
+                consensus_responses["generated"],
+                consensus_responses["generated"],
+                consensus_responses[review],
+                consensus_responses[review],
+            ]
         )
 
-        assert result.consensus_reached is False
-        assert result.final_output == "Generated output"
-
-    def test_reach_consensus_no_consensus_fallback(self, consensus_protocol):
-        def make_generate_response():
-            r = MagicMock()
-            r.choices = [MagicMock()]
-            r.choices[0].message.content = "Model output"
-            return r
-
-        def make_review_response():
-            r = MagicMock()
-            r.choices = [MagicMock()]
-            r.choices[0].message.content = json.dumps(
-                {
-                    "approved": False,
-                    "strengths": [],
-                    "concerns": [],
-                    "reasoning": "Not approved",
-                }
-            )
-            return r
-
-        call_count = {"calls": 0}
-
-        def side_effect(*args, **kwargs):
-            call_count["calls"] += 1
-            if call_count["calls"] % 2 == 1:
-                return make_generate_response()
-            return make_review_response()
-
-        consensus_protocol.openai_client.chat.completions.create.side_effect = side_effect
-
         result = consensus_protocol.reach_consensus(
             prompt_name="test_prompt",
             variables={"input": "test"},
-            max_rounds=1,
-            use_model_a_on_failure=False,
+            max_rounds=max_rounds,
+            use_model_a_on_failure=fallback,
         )
 
-        assert result.consensus_reached is False
-        assert "Manual Review Required" in result.final_output
+        assert isinstance(result, ConsensusResult)
+        assert result.consensus_reached is expected_consensus
+        assert expected_final in result.final_output
@@ -1,55 +1,109 @@
-import os
-from unittest.mock import MagicMock, patch
+import asyncio
+import copy
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
 
+import src.web.api as api_module
+from src.core.emperor_brain import EmperorBrain
+from src.infrastructure.database import Database
+from src.infrastructure.vector_store import VectorStore
+from src.memory.condensation import CondensationManager
+from src.memory.episodic import EpisodicMemory
+from src.models.schemas import Message, PsychUpdate, SemanticAssertion
+from src.web.api import AppState, get_analysis_status, get_profile
+
+# One fixed timestamp instead of a clock_gettime per test; also keeps
+# serialized created_at values reproducible across runs.
+_FIXED_NOW = datetime(2025, 1, 1, 12, 0, 0)
 
-@pytest.fixture
-def test_client(temp_dir):
-    os.environ["ENVIRONMENT"] = "development"
 
-    mock_db = MagicMock()
-    mock_vectors = MagicMock()
-    mock_brain = MagicMock()
-    mock_condensation = MagicMock()
-    mock_episodic = MagicMock()
+def _build_state_template():
+    """Mock service graph built once; each test deepcopies its own copy.
 
-    mock_user = MagicMock()
-    mock_user.id = "test_user_123"
+    spec= binds each mock to the real class, so attribute access is a
+    plain lookup instead of lazy child-mock allocation — and a typo'd
+    method name fails loudly instead of silently auto-mocking.
+    """
+    mock_db = MagicMock(spec=Database)
+    mock_condensation = MagicMock(spec=CondensationManager)
+
+    mock_user = SimpleNamespace(id="test_user_123", name=None, created_at=_FIXED_NOW)
     mock_db.get_or_create_user.return_value = mock_user
     mock_db.get_latest_profile.return_value = None
     mock_db.get_condensed_summaries.return_value = []
 
     mock_condensation.get_uncondensed_messages.return_value = []
+    mock_condensation.estimate_uncondensed_tokens.return_value = 0
     mock_condensation.chunk_threshold_tokens = 2000
 
-    mock_state = {
-        "initialized": True,
-        "config": {"sessions_between_analysis": 5},
-        "db": mock_db,
-        "vectors": mock_vectors,
-        "brain": mock_brain,
-        "condensation": mock_condensation,
-        "episodic": mock_episodic,
-    }
+    return AppState(
+        initialized=True,
+        config={"sessions_between_analysis": 5},
+        db=mock_db,
+        vectors=MagicMock(spec=VectorStore),
+        brain=MagicMock(spec=EmperorBrain),
+        condensation=mock_condensation,
+        episodic=MagicMock(spec=EpisodicMemory),
+    )
+
+
+_STATE_TEMPLATE = _build_state_template()
+
+# Validated once at import; the factory below hands out field-level variants
+# via model_copy, which skips pydantic validation entirely.
+_DEFAULT_PSYCH = PsychUpdate(
+    detected_patterns=[],
+    emotional_state="calm",
+    stoic_principle_applied="",
+    suggested_next_direction="",
+    confidence=0.5,
+    semantic_assertions=[],
+)
+
+
+@pytest.fixture
+def make_psych_update():
+    def _make(**overrides):
+        return _DEFAULT_PSYCH.model_copy(update=overrides)
+
+    return _make
+
+
+@pytest.fixture
+def test_client(temp_dir, monkeypatch, _client):
+    # The module constant is read at import, so patch it rather than the
+    # env var; the default is production (fail closed).
+    monkeypatch.setattr(api_module, "ENVIRONMENT", "development")
 
-    with patch("src.web.api._state", mock_state), patch("src.web.api._init"):
-        from fastapi.testclient import TestClient
+    # Per-request caches outlive a TestClient; drop anything a previous
+    # test's mocks left behind.
+    api_module._user_cache.clear()
+    api_module._profile_cache.clear()
+    api_module._retrieval_cache.clear()
+    api_module._expand_query_cached.cache_clear()
+    api_module._embed_cached.cache_clear()
 
-        from src.web.api import app
+    # No need to stub _init: it early-returns on the initialized flag,
+    # which the template state sets.
+    mock_state = copy.deepcopy(_STATE_TEMPLATE)
+    monkeypatch.setattr(api_module, "_state", mock_state)
 
-        yield TestClient(app), mock_db
+    yield _client, mock_state.db
 
 
 class TestProfileEndpoint:
+    # Pure handler logic: call the coroutine directly and skip the ASGI
+    # round trip. The with-profile test below keeps TestClient coverage.
     def test_get_profile_no_profile(self, test_client):
-        client, mock_db = test_client
+        _, mock_db = test_client
         mock_db.get_latest_profile.return_value = None
 
-        response = client.get("/api/profile")
+        result = asyncio.run(get_profile(user_id="test_user_123", db=mock_db))
 
-        assert response.status_code == 200
-        assert response.json() is None
+        assert result is None
 
     def test_get_profile_with_profile(self, test_client):
         client, mock_db = test_client
@@ -64,24 +118,24 @@ class TestProfileEndpoint:
 
         assert response.status_code == 200
         data = response.json()
-        assert data["version"] == 3
-        assert data["consensus_reached"] is True
-        assert data["stability_score"] == 0.85
+        assert {k: data[k] for k in ("version", "consensus_reached", "stability_score")} == {
+            "version": 3,
+            "consensus_reached": True,
+            "stability_score": 0.85,
+        }
 
 
 class TestAnalysisStatusEndpoint:
     def test_analysis_status_not_ready(self, test_client):
-        client, mock_db = test_client
+        _, mock_db = test_client
         mock_db.get_latest_profile.return_value = None
         mock_db.get_condensed_summaries.return_value = []
 
-        response = client.get("/api/analysis/status")
+        status = asyncio.run(get_analysis_status(user_id="test_user_123", db=mock_db))
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["uncondensed_tokens"] == 0
-        assert data["summary_count"] == 0
-        assert data["has_profile"] is False
+        assert status.uncondensed_tokens == 0
+        assert status.summary_count == 0
+        assert status.has_profile is False
 
     def test_analysis_status_ready(self, test_client):
         client, mock_db = test_client
@@ -97,37 +151,99 @@ class TestAnalysisStatusEndpoint:
 
 
 class TestChatEndpoint:
-    def test_chat_creates_response(self, test_client):
+    # The chat scenarios share all their mock wiring and differ only in
+    # which context source is populated; one parametrized test keeps the
+    # setup in one place and lets xdist fan the cases out.
+    @pytest.mark.parametrize(
+        "scenario", ["default", "new_session", "existing_id", "assertions", "profile", "summaries"]
+    )
+    def test_chat(self, test_client, make_psych_update, scenario):
         client, mock_db = test_client
-        from src.models.schemas import PsychUpdate
+        mock_session = SimpleNamespace(id="session_123")
+        payload = {"message": "Hello"}
+        psych_overrides = {}
+
+        if scenario == "new_session":
+            mock_db.get_latest_session.return_value = None
+        elif scenario == "existing_id":
+            mock_db.get_session.return_value = mock_session
+            payload["session_id"] = "session_123"
+        else:
+            mock_db.get_latest_session.return_value = mock_session
+
+        if scenario == "assertions":
+            psych_overrides["semantic_assertions"] = [
+                SemanticAssertion(text="User values family", confidence=0.9),
+                SemanticAssertion(text="User has work stress", confidence=0.85),
+            ]
+        if scenario == "profile":
+            mock_db.get_latest_profile.return_value = {"content": "User profile content"}
+        summaries = [SimpleNamespace(content="Previous conversation summary")] if scenario == "summaries" else []
 
-        mock_session = MagicMock()
-        mock_session.id = "session_123"
-        mock_db.get_latest_session.return_value = mock_session
         mock_db.get_session_messages.return_value = []
-
-        from src.web.api import _state
-
         mock_response = MagicMock()
         mock_response.response_text = "Greetings, seeker of wisdom."
-        mock_response.psych_update = PsychUpdate(
-            detected_patterns=[],
-            emotional_state="curious",
-            stoic_principle_applied="presence",
-            suggested_next_direction="continue exploration",
-            confidence=0.8,
-            semantic_assertions=[],
-        )
-        _state["brain"].respond.return_value = mock_response
-        _state["brain"].expand_query.return_value = "hello"
-        _state["condensation"].get_context_summaries.return_value = []
+        mock_response.psych_update = make_psych_update(**psych_overrides)
+        api_module._state.brain.respond.return_value = mock_response
+        api_module._state.brain.expand_query.return_value = "hello"
+        api_module._state.condensation.get_context_summaries.return_value = summaries
 
-        response = client.post("/api/chat", json={"message": "Hello"})
+        response = client.post("/api/chat", json=payload)
 
         assert response.status_code == 200
-        data = response.json()
-        assert data["response"] == "Greetings, seeker of wisdom."
-        assert data["session_id"] == "session_123"
+        assert response.json()["response"] == "Greetings, seeker of wisdom."
+        if scenario == "default":
+            assert response.json()["session_id"] == "session_123"
+        elif scenario == "new_session":
+            mock_db.create_session.assert_called()
+        elif scenario == "assertions":
+            mock_db.save_semantic_insights.assert_called_once()
+            assert len(mock_db.save_semantic_insights.call_args.args[0]) == 2
+
+    def test_chat_session_not_found(self, test_client):
+        client, mock_db = test_client
+        mock_db.get_session.return_value = None
+
+        response = client.post("/api/chat", json={"message": "Hi", "session_id": "nonexistent"})
+
+        assert response.status_code == 404
+
+
+class TestChatStreamEndpoint:
+    def _wire_stream(self, mock_db):
+        mock_db.get_latest_session.return_value = SimpleNamespace(id="session_123")
+        mock_db.get_session_messages.return_value = []
+        api_module._state.brain.expand_query.return_value = "hello"
+        api_module._state.condensation.get_context_summaries.return_value = []
+
+    def test_stream_happy_path(self, test_client):
+        client, mock_db = test_client
+        self._wire_stream(mock_db)
+        api_module._state.brain.respond_stream.return_value = iter(["Hello", " there"])
+
+        with client.stream("POST", "/api/chat/stream", json={"message": "Hi"}) as response:
+            assert response.status_code == 200
+            body = "".join(response.iter_text())
+
+        assert 'data: {"delta": "Hello"}' in body
+        assert '"done": true' in body
+        saved = mock_db.save_messages.call_args.args[0]
+        assert [m.role for m in saved] == ["user", "emperor"]
+        assert saved[1].content == "Hello there"
+
+    def test_stream_failure_before_first_token(self, test_client):
+        client, mock_db = test_client
+        self._wire_stream(mock_db)
+        api_module._state.brain.respond_stream.side_effect = RuntimeError("model down")
+
+        with pytest.raises(RuntimeError, match="model down"):
+            with client.stream("POST", "/api/chat/stream", json={"message": "Hi"}) as response:
+                "".join(response.iter_text())
+
+        # The user turn is kept, but no empty emperor message may be
+        # written into the session history.
+        saved = mock_db.save_messages.call_args.args[0]
+        assert [m.role for m in saved] == ["user"]
 
 
 class TestIndexRoute:
@@ -165,12 +281,8 @@ class TestConfigEndpoint:
 class TestUserEndpoint:
     def test_get_user(self, test_client):
         client, mock_db = test_client
-        from datetime import datetime
 
-        mock_user = MagicMock()
-        mock_user.id = "test_user_123"
-        mock_user.name = None
-        mock_user.created_at = datetime.now()
+        mock_user = SimpleNamespace(id="test_user_123", name=None, created_at=_FIXED_NOW)
         mock_db.get_or_create_user.return_value = mock_user
 
         response = client.get("/api/user")
@@ -181,12 +293,8 @@ class TestUserEndpoint:
 
     def test_update_user_name(self, test_client):
         client, mock_db = test_client
-        from datetime import datetime
 
-        mock_user = MagicMock()
-        mock_user.id = "test_user_123"
-        mock_user.name = "New Name"
-        mock_user.created_at = datetime.now()
+        mock_user = SimpleNamespace(id="test_user_123", name="New Name", created_at=_FIXED_NOW)
         mock_db.update_user_name.return_value = mock_user
 
         response = client.put("/api/user/name", json={"name": "New Name"})
@@ -217,11 +325,10 @@ class TestSessionsEndpoint:
 
     def test_list_sessions(self, test_client):
         client, mock_db = test_client
-        from datetime import datetime
 
         mock_db.get_user_sessions_with_counts.return_value = [
-            {"id": "sess1", "created_at": datetime.now(), "message_count": 5},
-            {"id": "sess2", "created_at": datetime.now(), "message_count": 3},
+            {"id": "sess1", "created_at": _FIXED_NOW, "message_count": 5},
+            {"id": "sess2", "created_at": _FIXED_NOW, "message_count": 3},
         ]
 
         response = client.get("/api/sessions")
@@ -233,16 +340,15 @@ class TestSessionsEndpoint:
     def test_get_session_messages(self, test_client):
         client, mock_db = test_client
 
-        mock_session = MagicMock()
-        mock_session.id = "sess_123"
-        mock_db.get_session.return_value = mock_session
+        mock_session = SimpleNamespace(id="sess_123")
 
-        from src.models.schemas import Message
-
-        mock_db.get_session_messages.return_value = [
-            Message(session_id="sess_123", role="user", content="Hello"),
-            Message(session_id="sess_123", role="emperor", content="Greetings"),
-        ]
+        mock_db.get_session_with_messages.return_value = (
+            mock_session,
+            [
+                Message(session_id="sess_123", role="user", content="Hello"),
+                Message(session_id="sess_123", role="emperor", content="Greetings"),
+            ],
+        )
 
         response = client.get("/api/sessions/sess_123/messages")
 
@@ -252,7 +358,7 @@ class TestSessionsEndpoint:
 
     def test_get_session_messages_not_found(self, test_client):
         client, mock_db = test_client
-        mock_db.get_session.return_value = None
+        mock_db.get_session_with_messages.return_value = (None, [])
 
         response = client.get("/api/sessions/nonexistent/messages")
 
@@ -287,171 +393,3 @@ class TestAnalysisRoute:
 
         assert response.status_code == 200
         assert "text/html" in response.headers["content-type"]
-
-
-class TestChatWithNewSession:
-    def test_chat_creates_new_session(self, test_client):
-        client, mock_db = test_client
-        from src.models.schemas import PsychUpdate
-
-        mock_db.get_latest_session.return_value = None
-        mock_db.get_session_messages.return_value = []
-
-        from src.web.api import _state
-
-        mock_response = MagicMock()
-        mock_response.response_text = "A response"
-        mock_response.psych_update = PsychUpdate(
-            detected_patterns=[],
-            emotional_state="neutral",
-            stoic_principle_applied="",
-            suggested_next_direction="",
-            confidence=0.5,
-            semantic_assertions=[],
-        )
-        _state["brain"].respond.return_value = mock_response
-        _state["brain"].expand_query.return_value = "query"
-        _state["condensation"].get_context_summaries.return_value = []
-
-        response = client.post("/api/chat", json={"message": "Hello"})
-
-        assert response.status_code == 200
-        mock_db.create_session.assert_called()
-
-    def test_chat_with_existing_session_id(self, test_client):
-        client, mock_db = test_client
-        from src.models.schemas import PsychUpdate
-
-        mock_session = MagicMock()
-        mock_session.id = "existing_session"
-        mock_db.get_session.return_value = mock_session
-        mock_db.get_session_messages.return_value = []
-
-        from src.web.api import _state
-
-        mock_response = MagicMock()
-        mock_response.response_text = "Response"
-        mock_response.psych_update = PsychUpdate(
-            detected_patterns=[],
-            emotional_state="calm",
-            stoic_principle_applied="",
-            suggested_next_direction="",
-            confidence=0.7,
-            semantic_assertions=[],
-        )
-        _state["brain"].respond.return_value = mock_response
-        _state["brain"].expand_query.return_value = "expanded"
-        _state["condensation"].get_context_summaries.return_value = []
-
-        response = client.post("/api/chat", json={"message": "Hi", "session_id": "existing_session"})
-
-        assert response.status_code == 200
-
-    def test_chat_session_not_found(self, test_client):
-        client, mock_db = test_client
-        mock_db.get_session.return_value = None
-
-        response = client.post("/api/chat", json={"message": "Hi", "session_id": "nonexistent"})
-
-        assert response.status_code == 404
-
-
-class TestChatWithSemanticAssertions:
-    def test_chat_stores_semantic_assertions(self, test_client):
-        client, mock_db = test_client
-        from src.models.schemas import PsychUpdate, SemanticAssertion
-
-        mock_session = MagicMock()
-        mock_session.id = "sess_assert"
-        mock_db.get_latest_session.return_value = mock_session
-        mock_db.get_session_messages.return_value = []
-
-        from src.web.api import _state
-
-        mock_response = MagicMock()
-        mock_response.response_text = "Response with assertions"
-        mock_response.psych_update = PsychUpdate(
-            detected_patterns=[],
-            emotional_state="reflective",
-            stoic_principle_applied="acceptance",
-            suggested_next_direction="continue",
-            confidence=0.8,
-            semantic_assertions=[
-                SemanticAssertion(text="User values family", confidence=0.9),
-                SemanticAssertion(text="User has work stress", confidence=0.85),
-            ],
-        )
-        _state["brain"].respond.return_value = mock_response
-        _state["brain"].expand_query.return_value = "query"
-        _state["condensation"].get_context_summaries.return_value = []
-
-        response = client.post("/api/chat", json={"message": "I value my family but work is stressful"})
-
-        assert response.status_code == 200
-        assert mock_db.save_semantic_insight.call_count == 2
-
-
-class TestChatWithProfile:
-    def test_chat_includes_profile(self, test_client):
-        client, mock_db = test_client
-        from src.models.schemas import PsychUpdate
-
-        mock_session = MagicMock()
-        mock_session.id = "sess_profile"
-        mock_db.get_latest_session.return_value = mock_session
-        mock_db.get_session_messages.return_value = []
-        mock_db.get_latest_profile.return_value = {"content": "User profile content"}
-
-        from src.web.api import _state
-
-        mock_response = MagicMock()
-        mock_response.response_text = "Response"
-        mock_response.psych_update = PsychUpdate(
-            detected_patterns=[],
-            emotional_state="calm",
-            stoic_principle_applied="",
-            suggested_next_direction="",
-            confidence=0.5,
-            semantic_assertions=[],
-        )
-        _state["brain"].respond.return_value = mock_response
-        _state["brain"].expand_query.return_value = "query"
-        _state["condensation"].get_context_summaries.return_value = []
-
-        response = client.post("/api/chat", json={"message": "Hello"})
-
-        assert response.status_code == 200
-
-
-class TestChatWithSummaries:
-    def test_chat_includes_summaries(self, test_client):
-        client, mock_db = test_client
-        from src.models.schemas import PsychUpdate
-
-        mock_session = MagicMock()
-        mock_session.id = "sess_sum"
-        mock_db.get_latest_session.return_value = mock_session
-        mock_db.get_session_messages.return_value = []
-
-        from src.web.api import _state
-
-        mock_summary = MagicMock()
-        mock_summary.content = "Previous conversation summary"
-        _state["condensation"].get_context_summaries.return_value = [mock_summary]
-
-        mock_response = MagicMock()
-        mock_response.response_text = "Response"
-        mock_response.psych_update = PsychUpdate(
-            detected_patterns=[],
-            emotional_state="calm",
-            stoic_principle_applied="",
-            suggested_next_direction="",
-            confidence=0.5,
-            semantic_assertions=[],
-        )
-        _state["brain"].respond.return_value = mock_response
-        _state["brain"].expand_query.return_value = "query"
-
-        response = client.post("/api/chat", json={"message": "Hello"})
-
-        assert response.status_code == 200
@@ -1,9 +1,13 @@
+import hashlib
 import os
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
+from jose import jwt
 
+import src.utils.auth as auth_module
 from src.utils.auth import (
     get_supabase_jwt_secret,
     get_user_id_from_token,
@@ -11,79 +15,107 @@ from src.utils.auth import (
     verify_supabase_token,
 )
 
+TEST_SECRET = "test-secret"
+
+# Tokens encoded once at import; each HS256 encode is an HMAC pass the tests
+# only need the result of. Distinct subs keep the module-global token cache
+# in src.utils.auth from coupling unrelated tests.
+TOKENS = {
+    "valid_sub": jwt.encode({"sub": "user-abc-123", "aud": "authenticated"}, TEST_SECRET, algorithm="HS256"),
+    "plain": jwt.encode({"sub": "user123", "aud": "authenticated"}, TEST_SECRET, algorithm="HS256"),
+    "no_sub": jwt.encode({"aud": "authenticated"}, TEST_SECRET, algorithm="HS256"),
+    "wrong_secret": jwt.encode({"sub": "user123", "aud": "authenticated"}, "correct-secret", algorithm="HS256"),
+    "cached_sub": jwt.encode({"sub": "cached-user", "aud": "authenticated"}, TEST_SECRET, algorithm="HS256"),
+    "expiring": jwt.encode(
+        {"sub": "expiring-user", "aud": "authenticated", "exp": int(time.time()) + 3600},
+        TEST_SECRET,
+        algorithm="HS256",
+    ),
+}
+
+
+def _credentials(token):
+    credentials = MagicMock()
+    credentials.credentials = token
+    return credentials
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _jwt_secret_env():
+    # One env write for the whole module instead of a patch.dict snapshot and
+    # restore of os.environ around every test. Tests needing a different
+    # secret override with monkeypatch.
+    os.environ["SUPABASE_JWT_SECRET"] = TEST_SECRET
+    yield
+    os.environ.pop("SUPABASE_JWT_SECRET", None)
+
 
 class TestGetSupabaseJwtSecret:
-    def test_returns_secret_when_set(self):
-        with patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "test-secret-key"}):
-            result = get_supabase_jwt_secret()
-            assert result == "test-secret-key"
+    def test_returns_secret_when_set(self, monkeypatch):
+        monkeypatch.setenv("SUPABASE_JWT_SECRET", "test-secret-key")
+        result = get_supabase_jwt_secret()
+        assert result == "test-secret-key"
 
-    def test_raises_when_not_set(self):
-        with patch.dict(os.environ, {}, clear=True):
-            os.environ.pop("SUPABASE_JWT_SECRET", None)
-            with pytest.raises(HTTPException) as exc_info:
-                get_supabase_jwt_secret()
-            assert exc_info.value.status_code == 500
-            assert "not configured" in exc_info.value.detail
+    def test_raises_when_not_set(self, monkeypatch):
+        monkeypatch.delenv("SUPABASE_JWT_SECRET", raising=False)
+        with pytest.raises(HTTPException) as exc_info:
+            get_supabase_jwt_secret()
+        assert exc_info.value.status_code == 500
+        assert "not configured" in exc_info.value.detail
 
 
 class TestVerifySupabaseToken:
     def test_valid_token(self):
-        from jose import jwt
-
-        secret = "test-secret-key-for-jwt"
-        token = jwt.encode({"sub": "user123", "aud": "authenticated"}, secret, algorithm="HS256")
-
-        with patch.dict(os.environ, {"SUPABASE_JWT_SECRET": secret}):
-            payload = verify_supabase_token(token)
-            assert payload["sub"] == "user123"
+        payload = verify_supabase_token(TOKENS["plain"])
+        assert payload["sub"] == "user123"
 
     def test_invalid_token(self):
-        with patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "secret"}):
-            with pytest.raises(HTTPException) as exc_info:
-                verify_supabase_token("invalid-token")
-            assert exc_info.value.status_code == 401
-            assert "Invalid token" in exc_info.value.detail
-
-    def test_wrong_secret(self):
-        from jose import jwt
+        with pytest.raises(HTTPException) as exc_info:
+            verify_supabase_token("invalid-token")
+        assert exc_info.value.status_code == 401
+        assert "Invalid token" in exc_info.value.detail
 
-        token = jwt.encode({"sub": "user123", "aud": "authenticated"}, "correct-secret", algorithm="HS256")
-
-        with patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "wrong-secret"}):
-            with pytest.raises(HTTPException) as exc_info:
-                verify_supabase_token(token)
-            assert exc_info.value.status_code == 401
+    def test_wrong_secret(self, monkeypatch):
+        monkeypatch.setenv("SUPABASE_JWT_SECRET", "wrong-secret")
+        with pytest.raises(HTTPException) as exc_info:
+            verify_supabase_token(TOKENS["wrong_secret"])
+        assert exc_info.value.status_code == 401
 
 
 class TestGetUserIdFromToken:
     def test_extracts_user_id(self):
-        from jose import jwt
+        user_id = get_user_id_from_token(_credentials(TOKENS["valid_sub"]))
+        assert user_id == "user-abc-123"
 
-        secret = "test-secret"
-        token = jwt.encode({"sub": "user-abc-123", "aud": "authenticated"}, secret, algorithm="HS256")
+    def test_missing_sub_claim(self):
+        with pytest.raises(HTTPException) as exc_info:
+            get_user_id_from_token(_credentials(TOKENS["no_sub"]))
+        assert exc_info.value.status_code == 401
+        assert "missing user ID" in exc_info.value.detail
 
-        credentials = MagicMock()
-        credentials.credentials = token
 
-        with patch.dict(os.environ, {"SUPABASE_JWT_SECRET": secret}):
-            user_id = get_user_id_from_token(credentials)
-            assert user_id == "user-abc-123"
+class TestTokenCache:
+    def test_repeat_call_skips_verification(self):
+        credentials = _credentials(TOKENS["cached_sub"])
 
-    def test_missing_sub_claim(self):
-        from jose import jwt
+        assert get_user_id_from_token(credentials) == "cached-user"
 
-        secret = "test-secret"
-        token = jwt.encode({"aud": "authenticated"}, secret, algorithm="HS256")
+        with patch.object(auth_module, "verify_supabase_token") as mock_verify:
+            assert get_user_id_from_token(credentials) == "cached-user"
+            mock_verify.assert_not_called()
 
-        credentials = MagicMock()
-        credentials.credentials = token
+    def test_cache_respects_token_exp(self):
+        expired_soon = int(time.time()) - 1
+        credentials = _credentials(TOKENS["expiring"])
 
-        with patch.dict(os.environ, {"SUPABASE_JWT_SECRET": secret}):
-            with pytest.raises(HTTPException) as exc_info:
-                get_user_id_from_token(credentials)
-            assert exc_info.value.status_code == 401
-            assert "missing user ID" in exc_info.value.detail
+        get_user_id_from_token(credentials)
+
+        key = hashlib.sha256(TOKENS["expiring"].encode()).digest()
+        auth_module._token_cache[key] = ("expiring-user", expired_soon)
+
+        with patch.object(auth_module, "verify_supabase_token", wraps=auth_module.verify_supabase_token) as mock_verify:
+            assert get_user_id_from_token(credentials) == "expiring-user"
+        mock_verify.assert_called_once()
 
 
 class TestOptionalAuth:
@@ -92,22 +124,9 @@ class TestOptionalAuth:
         assert result is None
 
     def test_returns_user_id_with_valid_credentials(self):
-        from jose import jwt
-
-        secret = "test-secret"
-        token = jwt.encode({"sub": "user123", "aud": "authenticated"}, secret, algorithm="HS256")
-
-        credentials = MagicMock()
-        credentials.credentials = token
-
-        with patch.dict(os.environ, {"SUPABASE_JWT_SECRET": secret}):
-            result = optional_auth(credentials)
-            assert result == "user123"
+        result = optional_auth(_credentials(TOKENS["plain"]))
+        assert result == "user123"
 
     def test_returns_none_with_invalid_credentials(self):
-        credentials = MagicMock()
-        credentials.credentials = "invalid-token"
-
-        with patch.dict(os.environ, {"SUPABASE_JWT_SECRET": "secret"}):
-            result = optional_auth(credentials)
-            assert result is None
+        result = optional_auth(_credentials("invalid-token"))
+        assert result is None
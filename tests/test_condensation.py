@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -7,6 +7,24 @@ from src.infrastructure.database import Database
 from src.memory.condensation import CondensationManager
 from src.memory.context_builder import ContextBuilder
 from src.models.schemas import CondensedSummary, Message, PsychUpdate, Session, User
+from src.utils.llm_adapter import LLMResult
+
+
+class FakeLLMClient:
+    """Plain-attribute stand-in for LLMClient.
+
+    Cheaper than wiring a MagicMock chain per test, and it answers both
+    generate and generate_result the way the condensation paths expect.
+    """
+
+    def __init__(self, response_text):
+        self._text = response_text
+
+    def generate(self, **kwargs):
+        return self._text
+
+    def generate_result(self, **kwargs):
+        return LLMResult(content=self._text, input_tokens=None, output_tokens=None)
 
 
 @pytest.fixture
@@ -45,11 +63,11 @@ def db_with_messages(test_db_path):
     for i in range(10):
         msg_time = base_time + timedelta(minutes=i * 10)
 
-        user_msg = Message(
-            session_id=session.id, role="user", content=f"User message {i}: " + "word " * 20, created_at=msg_time
+        messages.append(
+            Message(
+                session_id=session.id, role="user", content=f"User message {i}: " + "word " * 20, created_at=msg_time
+            )
         )
-        db.save_message(user_msg)
-        messages.append(user_msg)
 
         psych_update = PsychUpdate(
             detected_patterns=["pattern_1"],
@@ -59,15 +77,18 @@ def db_with_messages(test_db_path):
             confidence=0.8,
         )
 
-        emperor_msg = Message(
-            session_id=session.id,
-            role="emperor",
-            content=f"Emperor response {i}: " + "word " * 20,
-            psych_update=psych_update,
-            created_at=msg_time + timedelta(seconds=30),
+        messages.append(
+            Message(
+                session_id=session.id,
+                role="emperor",
+                content=f"Emperor response {i}: " + "word " * 20,
+                psych_update=psych_update,
+                created_at=msg_time + timedelta(seconds=30),
+            )
         )
-        db.save_message(emperor_msg)
-        messages.append(emperor_msg)
+
+    # One transaction for all 20 seed rows instead of a commit per message.
+    db.save_messages(messages)
 
     return db, user, session, messages
 
@@ -133,9 +154,7 @@ class TestCondensationManager:
         db, user, session, messages = db_with_messages
         manager = CondensationManager(db, test_config)
 
-        mock_llm = MagicMock()
-        mock_llm.generate.return_value = "Condensed summary content"
-        mock_llm_class.return_value = mock_llm
+        mock_llm_class.return_value = FakeLLMClient("Condensed summary content")
 
         chunk_messages = messages[:4]
 
@@ -157,9 +176,7 @@ class TestCondensationManager:
         user = User(id="test_user")
         db.create_user(user)
 
-        mock_llm = MagicMock()
-        mock_llm.generate.return_value = "Level 2 summary"
-        mock_llm_class.return_value = mock_llm
+        mock_llm_class.return_value = FakeLLMClient("Level 2 summary")
 
         summary1 = CondensedSummary(
             user_id=user.id,
@@ -198,17 +215,20 @@ class TestCondensationManager:
         user = User(id="test_user")
         db.create_user(user)
 
-        for i in range(5):
-            summary = CondensedSummary(
-                user_id=user.id,
-                level=1,
-                content="x" * 100,
-                period_start=datetime(2024, 1, i + 1),
-                period_end=datetime(2024, 1, i + 2),
-                source_message_count=10,
-                source_word_count=100,
-            )
-            db.save_condensed_summary(summary)
+        db.save_condensed_summaries(
+            [
+                CondensedSummary(
+                    user_id=user.id,
+                    level=1,
+                    content="x" * 100,
+                    period_start=datetime(2024, 1, i + 1),
+                    period_end=datetime(2024, 1, i + 2),
+                    source_message_count=10,
+                    source_word_count=100,
+                )
+                for i in range(5)
+            ]
+        )
 
         manager = CondensationManager(db, test_config)
 
@@ -261,9 +281,7 @@ class TestCondensationManager:
     def test_maybe_condense_triggers_when_threshold_exceeded(self, mock_llm_class, db_with_messages, test_config):
         db, user, session, messages = db_with_messages
 
-        mock_llm = MagicMock()
-        mock_llm.generate.return_value = "Condensed"
-        mock_llm_class.return_value = mock_llm
+        mock_llm_class.return_value = FakeLLMClient("Condensed")
 
         manager = CondensationManager(db, test_config)
 
@@ -368,17 +386,20 @@ class TestContextBuilder:
         user = User(id="test_user")
         db.create_user(user)
 
-        for level in [1, 1, 2]:
-            summary = CondensedSummary(
-                user_id=user.id,
-                level=level,
-                content="Content",
-                period_start=datetime(2024, 1, 1),
-                period_end=datetime(2024, 1, 5),
-                source_message_count=10,
-                source_word_count=100,
-            )
-            db.save_condensed_summary(summary)
+        db.save_condensed_summaries(
+            [
+                CondensedSummary(
+                    user_id=user.id,
+                    level=level,
+                    content="Content",
+                    period_start=datetime(2024, 1, 1),
+                    period_end=datetime(2024, 1, 5),
+                    source_message_count=10,
+                    source_word_count=100,
+                )
+                for level in [1, 1, 2]
+            ]
+        )
 
         builder = ContextBuilder(db, test_config)
 
@@ -28,6 +28,20 @@ class TestDatabaseInitialization:
 
         assert version is not None
 
+    def test_sqlite_pragmas_applied(self, temp_dir):
+        from sqlalchemy import text
+
+        # WAL only exists for file-backed databases, so this test stays on
+        # a real file instead of the shared in-memory fixture.
+        db = Database(str(temp_dir / "pragmas.db"))
+
+        with db.engine.connect() as conn:
+            journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+            synchronous = conn.execute(text("PRAGMA synchronous")).scalar()
+
+        assert journal_mode == "wal"
+        assert synchronous == 1
+
 
 class TestUserOperations:
     def test_create_user(self, test_db_path):
@@ -121,6 +135,24 @@ class TestMessageOperations:
 
         assert saved.id == msg.id
 
+    def test_save_messages_bulk(self, test_db_path):
+        db = Database(test_db_path)
+        db.create_user(User(id="u1"))
+        session = Session(user_id="u1")
+        db.create_session(session)
+
+        db.save_messages(
+            [
+                Message(session_id=session.id, role="user", content="Hello"),
+                Message(session_id=session.id, role="emperor", content="Greetings"),
+            ]
+        )
+
+        messages = db.get_session_messages(session.id)
+        assert [m.content for m in messages] == ["Hello", "Greetings"]
+        counts = db.get_user_sessions_with_counts("u1")
+        assert counts[0]["message_count"] == 2
+
     def test_get_session_messages(self, test_db_path):
         db = Database(test_db_path)
         db.create_user(User(id="user_msgs"))
@@ -136,6 +168,50 @@ class TestMessageOperations:
         assert messages[0].role == "user"
         assert messages[1].role == "emperor"
 
+    def test_get_session_with_messages(self, test_db_path):
+        db = Database(test_db_path)
+        db.create_user(User(id="u1"))
+        session = Session(user_id="u1")
+        db.create_session(session)
+        db.save_message(Message(session_id=session.id, role="user", content="Hello"))
+        db.save_message(Message(session_id=session.id, role="emperor", content="Greetings"))
+
+        found, messages = db.get_session_with_messages(session.id)
+
+        assert found is not None
+        assert found.id == session.id
+        assert [m.content for m in messages] == ["Hello", "Greetings"]
+
+    def test_get_session_with_messages_missing_session(self, test_db_path):
+        db = Database(test_db_path)
+
+        found, messages = db.get_session_with_messages("nonexistent")
+
+        assert found is None
+        assert messages == []
+
+    def test_get_session_with_messages_empty_session(self, test_db_path):
+        db = Database(test_db_path)
+        db.create_user(User(id="u1"))
+        session = Session(user_id="u1")
+        db.create_session(session)
+
+        found, messages = db.get_session_with_messages(session.id)
+
+        assert found is not None
+        assert messages == []
+
+    def test_sum_message_content_length(self, test_db_path):
+        db = Database(test_db_path)
+        db.create_user(User(id="u1"))
+        session = Session(user_id="u1")
+        db.create_session(session)
+        db.save_message(Message(session_id=session.id, role="user", content="abcd"))
+        db.save_message(Message(session_id=session.id, role="emperor", content="efghij"))
+
+        assert db.sum_message_content_length("u1") == 10
+        assert db.sum_message_content_length("other_user") == 0
+
     def test_get_unprocessed_messages(self, test_db_path, sample_psych_update):
         db = Database(test_db_path)
         db.create_user(User(id="user_unproc"))
@@ -181,6 +257,21 @@ class TestSemanticInsightOperations:
 
         assert saved.assertion == "User struggles with father relationship"
 
+    def test_save_semantic_insights_bulk(self, test_db_path):
+        db = Database(test_db_path)
+        db.create_user(User(id="user_insight_bulk"))
+
+        insights = [
+            SemanticInsight(
+                user_id="user_insight_bulk", source_message_id="msg_1", assertion=f"Insight {i}", confidence=0.7
+            )
+            for i in range(3)
+        ]
+
+        db.save_semantic_insights(insights)
+
+        assert len(db.get_user_insights("user_insight_bulk")) == 3
+
     def test_get_user_insights(self, test_db_path):
         db = Database(test_db_path)
         db.create_user(User(id="user_insights"))
@@ -154,6 +154,22 @@ class TestEmperorBrainUnit:
         assert isinstance(result, EmperorResponse)
         mock_llm.generate.assert_called_once()
 
+    def test_respond_stream_yields_chunks(self):
+        from unittest.mock import MagicMock
+
+        from src.core.emperor_brain import EmperorBrain
+
+        mock_llm = MagicMock()
+        mock_llm.generate_stream.return_value = iter(["A ", "streamed ", "reply"])
+
+        brain = EmperorBrain(llm_client=mock_llm)
+
+        chunks = list(brain.respond_stream(user_message="Test message"))
+
+        assert chunks == ["A ", "streamed ", "reply"]
+        mock_llm.generate_stream.assert_called_once()
+        assert "plain prose" in mock_llm.generate_stream.call_args.kwargs["prompt"]
+
     def test_respond_with_prompt_leakage_blocked(self):
         from unittest.mock import MagicMock
 
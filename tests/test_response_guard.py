@@ -118,3 +118,10 @@ class TestGuardResponse:
         result, was_blocked = guard_response(response, protected, ngram_size=4, threshold=0.2)
         assert was_blocked is True
         assert "focus on what brings you here" in result
+
+    def test_guard_is_reused_for_same_prompt(self):
+        from src.utils.response_guard import _get_guard
+
+        guard_a = _get_guard("protected prompt shared across calls here", 5, 0.3)
+        guard_b = _get_guard("protected prompt shared across calls here", 5, 0.3)
+        assert guard_a is guard_b
@@ -0,0 +1,72 @@
+import numpy as np
+
+from src.cache.semantic_cache import SemanticResponseCache
+
+
+class TestSemanticResponseCache:
+    def test_lookup_empty_cache_returns_none(self):
+        cache = SemanticResponseCache()
+        assert cache.lookup(np.ones(8, dtype=np.float32), "prefix") is None
+
+    def test_exact_match_hit(self):
+        cache = SemanticResponseCache()
+        embedding = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+        cache.store(embedding, "prefix", "cached answer")
+
+        assert cache.lookup(embedding, "prefix") == "cached answer"
+
+    def test_near_duplicate_hit(self):
+        cache = SemanticResponseCache(similarity_threshold=0.92)
+        stored = np.array([1.0, 0.05, 0.0, 0.0], dtype=np.float32)
+        query = np.array([1.0, 0.0, 0.05, 0.0], dtype=np.float32)
+
+        cache.store(stored, "prefix", "cached answer")
+
+        assert cache.lookup(query, "prefix") == "cached answer"
+
+    def test_dissimilar_query_misses(self):
+        cache = SemanticResponseCache()
+        cache.store(np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32), "prefix", "cached answer")
+
+        query = np.array([0.0, 1.0, 0.0, 0.0], dtype=np.float32)
+        assert cache.lookup(query, "prefix") is None
+
+    def test_different_prefix_misses(self):
+        cache = SemanticResponseCache()
+        embedding = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+        cache.store(embedding, "prefix_a", "cached answer")
+
+        assert cache.lookup(embedding, "prefix_b") is None
+
+    def test_expired_entry_misses(self):
+        cache = SemanticResponseCache(ttl_seconds=0)
+        embedding = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+        cache.store(embedding, "prefix", "cached answer")
+
+        assert cache.lookup(embedding, "prefix") is None
+
+    def test_eviction_respects_maxsize(self):
+        cache = SemanticResponseCache(maxsize=2)
+        first = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+        second = np.array([0.0, 1.0, 0.0, 0.0], dtype=np.float32)
+        third = np.array([0.0, 0.0, 1.0, 0.0], dtype=np.float32)
+
+        cache.store(first, "prefix", "first")
+        cache.store(second, "prefix", "second")
+        cache.store(third, "prefix", "third")
+
+        assert cache.lookup(first, "prefix") is None
+        assert cache.lookup(second, "prefix") == "second"
+        assert cache.lookup(third, "prefix") == "third"
+
+    def test_clear(self):
+        cache = SemanticResponseCache()
+        embedding = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+        cache.store(embedding, "prefix", "cached answer")
+
+        cache.clear()
+
+        assert cache.lookup(embedding, "prefix") is None
@@ -97,6 +97,61 @@ class TestVectorStoreOperations:
         assert "del_1" not in results.get("ids", [])
 
 
+class TestVectorStoreBatchQuery:
+    def test_query_batch_returns_all_collections(self, test_vector_path):
+        vs = VectorStore(test_vector_path)
+
+        vs.add(collection="stoic_wisdom", ids=["b1"], documents=["Endure and renounce"])
+        vs.add(collection="psychoanalysis", ids=["b2"], documents=["Projection of inner conflict"])
+
+        results = vs.query_batch(["stoic_wisdom", "psychoanalysis"], query_texts=["conflict"], n_results=1)
+
+        assert set(results.keys()) == {"stoic_wisdom", "psychoanalysis"}
+        assert "documents" in results["stoic_wisdom"]
+        assert "documents" in results["psychoanalysis"]
+
+    def test_query_batch_per_collection_limits_and_filters(self, test_vector_path):
+        vs = VectorStore(test_vector_path)
+
+        vs.add(
+            collection="semantic",
+            ids=["bi1", "bi2", "bi3"],
+            documents=["Insight one", "Insight two", "Insight three"],
+            metadatas=[{"user_id": "u1"}, {"user_id": "u1"}, {"user_id": "u2"}],
+        )
+        vs.add(collection="stoic_wisdom", ids=["bw1"], documents=["Amor fati"])
+
+        results = vs.query_batch(
+            ["stoic_wisdom", "semantic"],
+            query_texts=["insight"],
+            n_results=[1, 5],
+            wheres=[None, {"user_id": "u1"}],
+        )
+
+        assert len(results["semantic"]["documents"][0]) == 2
+        assert len(results["stoic_wisdom"]["documents"][0]) <= 1
+
+    def test_query_batch_no_input_raises(self, test_vector_path):
+        vs = VectorStore(test_vector_path)
+
+        with pytest.raises(ValueError, match="Either query_texts or query_embeddings"):
+            vs.query_batch(["episodic"])
+
+    def test_query_batch_matches_single_queries(self, test_vector_path):
+        vs = VectorStore(test_vector_path)
+
+        vs.add(
+            collection="stoic_wisdom",
+            ids=["eq1", "eq2"],
+            documents=["The obstacle is the way", "Waste no more time arguing"],
+        )
+
+        single = vs.query(collection="stoic_wisdom", query_texts=["obstacle"], n_results=2)
+        batched = vs.query_batch(["stoic_wisdom"], query_texts=["obstacle"], n_results=2)
+
+        assert batched["stoic_wisdom"]["documents"] == single["documents"]
+
+
 class TestVectorStorePersistence:
     def test_data_persists(self, test_vector_path):
         vs1 = VectorStore(test_vector_path)